@@ -6,59 +6,252 @@ implementations.
 Listing
 --------------
 _mp_objmethod, function
+ReplicationSummary(object), class
 MOSOSolver(object), class
 RASolver(MOSOSolver), class
 RLESolver(RASolver), class
 Oracle(object), class
+ExternalOracle(Oracle), class
 """
-from statistics import mean, variance
 from math import sqrt, ceil, floor
-from .prng.mrg32k3a import get_next_prnstream, jump_substream, mrg32k3a, bsm
+from .prng.mrg32k3a import MRG32k3a, MultiStreamMRG32k3a, jump_substream, jump_seed, stream_at, mrg32k3a, bsm, a1p76, a2p76
 from multiprocessing import Queue, Process
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    # before Python 3.8, observations go back through the queue
+    shared_memory = None
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import pickle
+import queue
+import subprocess
+import threading
+from struct import pack_into, unpack_from
 import sys
 from .chnutils import perturb, argsort, enorm, get_setnbors, get_nbors, is_lwep, get_nondom, does_strict_dominate, does_weak_dominate, does_dominate, get_biparetos
 
 
-def mp_replicate(orccls, x, rngcls, seed):
+def mp_chunkworker(input, output, orcdump):
     """
-    Wrap `Oracle.g` in a top-level function for use with multiprocessing.
+    Unpickle an Oracle once, then simulate chunks of replications from
+    the `input` queue and put one summary per chunk in the `output`
+    queue.
 
     Parameters
     ----------
-    orccls : Oracle class
-    x : tuple of int
-    rngcls : random.Random class
-    seed : tuple of int
-
-    Returns
-    -------
-    isfeas : bool
-    objvals : tuple of float
+    input : multiprocessing.Queue object
+        Chunks (tag, x, seeds, invnorm, obsbuf): a point, the seed of
+        each of its replications, the inverse normal cdf of the
+        generator, and None or the (name, first row) of the shared
+        memory in which to write the observations. The name is None
+        without shared memory.
+    output : multiprocessing.Queue object
+        Results (tag, isfeas, summary), or (tag, isfeas, infeasible)
+        if the chunk wrote its observations, where infeasible lists the
+        (index, objd) of its infeasible replications, whose values are
+        not written. Without shared memory, (tag, isfeas, obs) with the
+        (isfeas, objd) of every replication. (tag, exception, None) if
+        the simulation raised one
+    orcdump : bytes
+        The pickled Oracle, see `Oracle.mp_dumps`
 
     See also
     --------
-    Oracle.replicate
+    Oracle.run_chunks
     """
+    orc = pickle.loads(orcdump)
+    rng = orc.rng
+    obsfmt = '%dd' % orc.num_obj
+    shm = None
+    for tag, x, seeds, invnorm, obsbuf in iter(input.get, 'STOP'):
+        try:
+            rng.set_inverse_normal(invnorm)
+            if obsbuf is None:
+                isfeas, summ = orc.replicate_chunk(x, seeds, rng)
+            else:
+                obs = []
+                isfeas, summ = orc.replicate_chunk(x, seeds, rng, obs)
+                summ = []
+                name, row = obsbuf
+                if name is None:
+                    output.put((tag, isfeas, obs))
+                    continue
+                if shm is None or shm.name != name:
+                    if shm is not None:
+                        shm.close()
+                    # the parent owns the block and unlinks it
+                    shm = shared_memory.SharedMemory(name)
+                # write the row of each feasible replication, and send back
+                # the values of the others, which need not be numbers
+                for i, (isfeasi, oval) in enumerate(obs):
+                    if isfeasi:
+                        pack_into(obsfmt, shm.buf, 8*orc.num_obj*row, *oval)
+                    else:
+                        summ.append((i, oval))
+                    row += 1
+            output.put((tag, isfeas, summ))
+        except Exception as err:
+            output.put((tag, err, None))
+
 
-    rng = rngcls(seed)
-    orc = orccls(rng)
-    orc.set_crnflag(False)
-    isfeas, objvals = orc.g(x, rng)
-    return isfeas, objvals
+# executors of parallel replications accepted by `Oracle.set_simpar`
+simbackends = ('serial', 'thread', 'process')
+# attributes of an Oracle that stay in the process which set them
+mp_localattrs = ('req_q', 'res_q', 'proc', 'pool', 'pool_rngs', 'obsbuf', 'obsbuf_cap')
 
 
-def mp_worker(input, output):
+class ReplicationSummary(object):
     """
-    Process an item from `input` queue and place results in `output` queue.
+    Running count, means, and sums of squared deviations (M2) of the
+    objective values of simulation replications, updated in one pass
+    without storing the replications.
+
+    Attributes
+    ----------
+    count : int
+    Number of replications
+    means : list of float
+    Mean of each objective
+    m2s : list of float
+    Sum of squared deviations from the mean of each objective
 
     Parameters
     ----------
-    input : multiprocessing.Queue object
-    output : multiprocessing.Queue object
+    num_obj : int
+    Number of objectives
+
+    Notes
+    -----
+    `add` is Welford's update, and `merge` is Chan's formula for
+    combining the summaries of disjoint sets of replications, e.g.
+    chunks simulated in parallel.
     """
-    for func, args in iter(input.get, 'STOP'):
-        result = func(*args)
-        output.put(result)
+
+    __slots__ = ('count', 'means', 'm2s')
+
+    def __init__(self, num_obj):
+        self.count = 0
+        self.means = [0.0]*num_obj
+        self.m2s = [0.0]*num_obj
+
+    def add(self, objd):
+        """
+        Add one replication.
+
+        Parameters
+        ----------
+        objd : tuple of float
+    Objective values of the replication
+        """
+        self.count += 1
+        n = self.count
+        means = self.means
+        m2s = self.m2s
+        for k, val in enumerate(objd):
+            delta = val - means[k]
+            means[k] += delta/n
+            m2s[k] += delta*(val - means[k])
+
+    def add_array(self, objarr):
+        """
+        Add the rows of a NumPy array as replications.
+
+        Parameters
+        ----------
+        objarr : numpy.ndarray
+    Array with one row of objective values per replication
+        """
+        other = ReplicationSummary(0)
+        other.count = len(objarr)
+        if other.count:
+            chmean = objarr.mean(axis=0)
+            other.means = chmean.tolist()
+            other.m2s = ((objarr - chmean)**2).sum(axis=0).tolist()
+            self.merge(other)
+
+    def merge(self, other):
+        """
+        Combine the summary of other replications into this one.
+
+        Parameters
+        ----------
+        other : ReplicationSummary object
+
+        Returns
+        -------
+        ReplicationSummary object
+    This summary
+        """
+        na = self.count
+        nb = other.count
+        if nb == 0:
+            return self
+        if na == 0:
+            self.count = nb
+            self.means = list(other.means)
+            self.m2s = list(other.m2s)
+            return self
+        n = na + nb
+        means = self.means
+        m2s = self.m2s
+        for k in range(len(means)):
+            delta = other.means[k] - means[k]
+            means[k] += delta*nb/n
+            m2s[k] += other.m2s[k] + delta*delta*na*nb/n
+        self.count = n
+        return self
+
+    def add_hit(self, count, obmean, obse):
+        """
+        Add the replications summarized by the means and standard
+        errors returned by `Oracle.hit`.
+
+        Parameters
+        ----------
+        count : int
+    Number of replications
+    obmean : tuple of float
+    obse : tuple of float
+        """
+        other = ReplicationSummary(0)
+        other.count = count
+        other.means = list(obmean)
+        other.m2s = [se*se*count*(count - 1) for se in obse]
+        self.merge(other)
+
+    def mean(self):
+        """
+        Return the mean of each objective.
+
+        Returns
+        -------
+        tuple of float
+        """
+        return tuple(self.means)
+
+    def variance(self):
+        """
+        Return the sample variance of each objective. Requires at least
+        2 replications.
+
+        Returns
+        -------
+        tuple of float
+        """
+        return tuple(m2/(self.count - 1) for m2 in self.m2s)
+
+    def stderr(self):
+        """
+        Return the standard error of the mean of each objective.
+        Requires at least 2 replications.
+
+        Returns
+        -------
+        tuple of float
+        """
+        n = self.count
+        return tuple(sqrt(m2/(n - 1)/n) for m2 in self.m2s)
 
 
 class MOSOSolver(object):
@@ -139,6 +332,13 @@ class RASolver(MOSOSolver):
     The iteration number
     endseed : tuple of int
     The next seed to be used by 'orc.rng'
+    accumulate : bool
+    If True, keep the replications of points across iterations and
+    simulate only enough new ones to reach the sample size of the
+    current iteration, see Notes. Defaults to False.
+    accum : dict
+    Dictionary of {tuple of int: ReplicationSummary} of every feasible
+    point sampled in any iteration, in accumulate mode.
 
     Parameters
     ----------
@@ -149,12 +349,24 @@ class RASolver(MOSOSolver):
     -----
     The method spsolve must be implemented to use an RASolver in
     PyMOSO
+
+    In accumulate mode, a point sampled at m_prev replications in an
+    earlier iteration costs only m - m_prev replications, taken from the
+    streams of the current iteration. The estimators of successive
+    iterations are then dependent, rather than independent as RA
+    assumes, and an unlucky estimate persists with decreasing weight
+    instead of being discarded. With CRN, points share only the
+    replications of the iterations in which they were sampled together,
+    so comparisons between points carry less common noise than at
+    m common replications.
     """
 
     def __init__(self, orc, **kwargs):
         self.nbor_rad = kwargs.pop('radius', 1)
         self.mconst = kwargs.pop('mconst', 2)
         self.bconst = kwargs.pop('bconst', 8)
+        self.accumulate = bool(kwargs.pop('accumulate', False))
+        self.accum = dict()
         try:
             self.sprn = kwargs.pop('sprn')
             self.x0 = kwargs.pop('x0')
@@ -428,8 +640,9 @@ class RASolver(MOSOSolver):
         ghat = {}
         xbest = None
         fxbest = None
+        simpest = self.estimate_many(simp)
         for i in range(q + 1):
-            isfeas, fx, vx = self.estimate(simp[i])
+            isfeas, fx, vx = simpest[i]
             if isfeas:
                 isfeas2, fx, vx = self.estimate(simp[i], e, kcon)
                 if isfeas2:
@@ -563,64 +776,187 @@ class RASolver(MOSOSolver):
     vx : tuple of float
     Standard errors of 'fx'
         """
+        return self.estimate_many([x], con, nobj)[0]
+
+    def estimate_many(self, points, con=float('inf'), nobj=0):
+        """
+        Estimate several points, simulating those not yet sampled in
+        this iteration together through `orc.hit_many`. The results,
+        simulation counts, and random numbers are those of calling
+        `estimate` on each point in turn.
+
+        Parameters
+        ----------
+        points : list of tuple of int
+    Points to simulate, in order
+    con : float
+    Constraint value to check feasibility, default is
+    float('inf') i.e. unconstrained
+    nobj : int
+    Index of objective to minimize, default is 0, takes values
+    in {0, 1, ..., len('x') -1}
+
+    Returns
+    -------
+    list of tuple
+    The `estimate` result (isfeas, fx, vx) of each point, in order
+        """
+        points = list(points)
+        results = [None]*len(points)
+        batch = {}
+        for j, x in enumerate(points):
+            # an infeasible point is simulated again by a later estimate,
+            # so simulate the batch before a repeated point
+            if x in batch:
+                for k, res in zip(batch.values(), self.sample(list(batch))):
+                    results[k] = res
+                batch = {}
+            #first, check if x has already been sampled in this iteration
+            if x in self.gbar:
+                results[j] = True, self.gbar[x], self.sehat[x]
+            #then, leave out points the oracle rejects without simulating
+            elif not self.can_sample(x):
+                results[j] = self.orc.infeasible_hit()
+            #if not, sample it with the batch
+            else:
+                batch[x] = j
+        for k, res in zip(batch.values(), self.sample(list(batch))):
+            results[k] = res
+        #next, check feasibility against the constraint which may be different
+        # than oracle feasibility
+        for j, (isfeas, fx, vx) in enumerate(results):
+            if isfeas and fx[nobj] > con:
+                results[j] = False, fx, vx
+        return results
+
+    def can_sample(self, x):
+        """
+        Check whether a point needs to be sampled to find whether it is
+        feasible.
+
+        Parameters
+        ----------
+        x : tuple of int
+
+    Returns
+    -------
+    bool
+    False if CRN is on and `orc.is_feasible` rejects 'x'. Without
+    CRN, sampling a point moves the oracle streams even if it is
+    rejected, which `orc.hit` then does without simulating.
+        """
+        return not self.orc.crnflag or self.orc.is_feasible(x)
+
+    def sample(self, batch):
+        """
+        Simulate distinct points at the iteration sample size, update
+        the number of simulation calls, and store the feasible results.
+
+        Parameters
+        ----------
+        batch : list of tuple of int
+    Points to simulate, in order
+
+    Returns
+    -------
+    hits : list of tuple
+    The `orc.hit` result (isfeas, fx, vx) of each point, in order
+        """
+        if not batch:
+            return []
         m = self.m
-        #first, check if x has already been sampled in this iteration
-        if x in self.gbar:
-            isfeas = True
-            fx = self.gbar[x]
-            vx = self.sehat[x]
-        #if not, perform sampling
-        else:
-            #print('in: ', self.orc.rng.get_seed())
-            try:
-                isfeas, fx, vx = self.orc.hit(x, m)
-            except TypeError:
-                print('--* Error: Unable to simulate ', type(self.orc).__name__, '. ')
-                print('--* Message: ', sys.exc_info()[1])
-                print('--* Ensure the g signature is g(self, x, rng). ')
-                print('--* Ensure isfeas, (obj1, obj2, ...) is returned. ')
-                print('--* Aborting. ')
-                sys.exit()
-            except ZeroDivisionError:
-                print('--* Error: Unable to simulate ', type(self.orc).__name__, '. ')
-                print('--* Message: ', sys.exc_info()[1])
-                print('--* Aborting. ')
-                sys.exit()
-            except ValueError:
-                print('--* Error: Unable to simulate ', type(self.orc).__name__, '. ')
-                print('--* Message: ', sys.exc_info()[1])
-                print('--* Ensure the g signature is g(self, x, rng). ')
-                print('--* Ensure isfeas, (obj1, obj2, ...) is returned. ')
-                print('--* Aborting. ')
-                sys.exit()
-            except AttributeError:
-                print('--* Error: Unable to simulate ', type(self.orc).__name__, '. ')
-                print('--* Message: ', sys.exc_info()[1])
-                print('--* Are you missing an import?')
-                print('--* Aborting. ')
-                sys.exit()
-            except IndexError:
-                print('--* Error: Unable to simulate ', type(self.orc).__name__, '. ')
-                print('--* Message: ', sys.exc_info()[1])
-                print('--* Ensure len(obj1, obj2, ..) == num_obj')
-                print('--* Aborting. ')
-                sys.exit()
-            except:
-                print('--* Error: Unable to simulate ', type(self.orc).__name__, '. ')
-                print('--* Message: ', sys.exc_info()[1])
-                print('--* Aborting. ')
-                sys.exit()
+        needs = [m for x in batch]
+        if self.accumulate:
+            needs = [m - self.accum[x].count if x in self.accum else m for x in batch]
+        hits = [None for x in batch]
+        # simulate points needing the same number of replications together
+        groups = dict()
+        for j, need in enumerate(needs):
+            if need > 0:
+                groups.setdefault(need, []).append(j)
+        #print('in: ', self.orc.rng.get_seed())
+        try:
+            for need, js in groups.items():
+                for j, hit in zip(js, self.orc.hit_many([batch[j] for j in js], need)):
+                    hits[j] = hit
+        except TypeError:
+            print('--* Error: Unable to simulate ', type(self.orc).__name__, '. ')
+            print('--* Message: ', sys.exc_info()[1])
+            print('--* Ensure the g signature is g(self, x, rng). ')
+            print('--* Ensure isfeas, (obj1, obj2, ...) is returned. ')
+            print('--* Aborting. ')
+            sys.exit()
+        except ZeroDivisionError:
+            print('--* Error: Unable to simulate ', type(self.orc).__name__, '. ')
+            print('--* Message: ', sys.exc_info()[1])
+            print('--* Aborting. ')
+            sys.exit()
+        except ValueError:
+            print('--* Error: Unable to simulate ', type(self.orc).__name__, '. ')
+            print('--* Message: ', sys.exc_info()[1])
+            print('--* Ensure the g signature is g(self, x, rng). ')
+            print('--* Ensure isfeas, (obj1, obj2, ...) is returned. ')
+            print('--* Aborting. ')
+            sys.exit()
+        except AttributeError:
+            print('--* Error: Unable to simulate ', type(self.orc).__name__, '. ')
+            print('--* Message: ', sys.exc_info()[1])
+            print('--* Are you missing an import?')
+            print('--* Aborting. ')
+            sys.exit()
+        except IndexError:
+            print('--* Error: Unable to simulate ', type(self.orc).__name__, '. ')
+            print('--* Message: ', sys.exc_info()[1])
+            print('--* Ensure len(obj1, obj2, ..) == num_obj')
+            print('--* Aborting. ')
+            sys.exit()
+        except:
+            print('--* Error: Unable to simulate ', type(self.orc).__name__, '. ')
+            print('--* Message: ', sys.exc_info()[1])
+            print('--* Aborting. ')
+            sys.exit()
+        for j, x in enumerate(batch):
+            if self.accumulate:
+                hits[j] = self.accumulate_hit(x, needs[j], hits[j])
+            isfeas, fx, vx = hits[j]
             if isfeas:
                 #print('out: ', self.orc.rng.get_seed())
-                self.num_calls += m
+                self.num_calls += max(needs[j], 0)
                 self.gbar[x] = fx
                 self.sehat[x] = vx
-        #next, check feasibility against the constraint which may be different
-        # than oracle feasibility
-        if isfeas:
-            if fx[nobj] > con:
-                isfeas = False
-        return isfeas, fx, vx
+        return hits
+
+    def accumulate_hit(self, x, need, hit):
+        """
+        Add new replications of a point to those of earlier iterations.
+
+        Parameters
+        ----------
+        x : tuple of int
+    Simulated point
+    need : int
+    Number of new replications
+    hit : tuple
+    The `orc.hit` result (isfeas, fx, vx) of the new replications,
+    or None if 'need' is not positive
+
+        Returns
+        -------
+        tuple
+    The (isfeas, fx, vx) of all replications of 'x'
+        """
+        if need > 0:
+            isfeas, fx, vx = hit
+            if not isfeas:
+                self.accum.pop(x, None)
+                return hit
+            if x not in self.accum:
+                self.accum[x] = ReplicationSummary(self.num_obj)
+            self.accum[x].add_hit(need, fx, vx)
+        summ = self.accum[x]
+        if summ.count == 1:
+            return True, summ.mean(), tuple(0 for k in range(self.num_obj))
+        return True, summ.mean(), summ.stderr()
 
     # def spsolve(self, warm_start):
     #     """Solve a sample path problem. Implement this in the child class."""
@@ -642,8 +978,8 @@ class RASolver(MOSOSolver):
     Subset of 'mcS' which are feasible
         """
         outset = set()
-        for s in mcS:
-            isfeas, fs, ses = self.estimate(s)
+        mcS = list(mcS)
+        for s, (isfeas, fs, ses) in zip(mcS, self.estimate_many(mcS)):
             if isfeas:
                 outset |= {s}
         return outset
@@ -710,7 +1046,7 @@ class RASolver(MOSOSolver):
         lwepset = set()
         domset = set()
         delz = [0]*self.num_obj
-        nbors = get_setnbors(mcS, r)
+        nbors = get_setnbors(mcS, r, self.can_sample)
         nbors = self.upsample(nbors)
         tmpd = {x: self.gbar[x] for x in mcS | nbors}
         for s in mcS:
@@ -907,25 +1243,24 @@ class RLESolver(RASolver):
         d = self.num_obj
         r = self.nbor_rad
         dr = range(d)
-        delN = get_setnbors(mcS, r)
+        delN = get_setnbors(mcS, r, self.can_sample)
         delzero = tuple(0 for i in dr)
         # defintion 9 (a) -- check for strict domination in the deleted nbors
-        for s in mcS:
+        snbs = [(s, x) for s in mcS for x in get_nbors(s, r, self.can_sample) - mcS]
+        snbest = self.estimate_many([x for s, x in snbs])
+        for (s, x), (isfeas, fx, sex) in zip(snbs, snbest):
             fs = self.gbar[s]
             ses = self.sehat[s]
             #dels = tuple(self.calc_delta(ses[i]) for i in dr)
-            snb = get_nbors(s, r) - mcS
-            for x in snb:
-                isfeas, fx, sex = self.estimate(x)
-                if isfeas:
-                    #delx = tuple(self.calc_delta(sex[i]) for i in dr)
-                    if does_strict_dominate(fx, fs, delzero, delzero):
-                        ncn |= {x}
-                    # if does_strict_dominate(fs, fx, delzero, delzero):
-                    #     nisdom |= {x}
+            if isfeas:
+                #delx = tuple(self.calc_delta(sex[i]) for i in dr)
+                if does_strict_dominate(fx, fs, delzero, delzero):
+                    ncn |= {x}
+                # if does_strict_dominate(fs, fx, delzero, delzero):
+                #     nisdom |= {x}
         # definition 9 (b) initialization
-        for x in delN - ncn:
-            isfeas, fx, sex = self.estimate(x)
+        delNc = list(delN - ncn)
+        for x, (isfeas, fx, sex) in zip(delNc, self.estimate_many(delNc)):
             if isfeas:
                 # definition 9 (b) (i) initialization
                 notweakdom = True
@@ -1020,7 +1355,7 @@ class Oracle(object):
     objective values at feasible points
     crnold_state : tuple
     Tuple of length 2. The first item is a tuple of int, which is
-    an mrg32k3a seed. The second is random.Random state.
+    an mrg32k3a seed. The second is the cached gauss variate or None.
     crn_obsold : tuple
     Like crnold_state
     crnflag : bool
@@ -1028,41 +1363,131 @@ class Oracle(object):
     Defaults to off.
     simpar : int
     Number of processes to use when doing simulations. Defaults to 1
+    backend : str
+    How parallel replications are taken, 'process', 'thread', or
+    'serial'. Set by `set_simpar`.
+    simchunks : int
+    Number of chunks into which `hit` splits the replications of a
+    point, at most. Processes take whole chunks, and the chunk
+    summaries are merged in order whatever simpar is. Defaults to 8.
+    streams : prng.StreamTree object or None
+    Trial node whose iteration and replication children seed the
+    Oracle, if set by `set_streams`. Defaults to None, i.e. legacy
+    streams and substreams.
     dim : int
     Number of dimensions of feasible points
     num_obj : int
     Number of objectives returned by g
+    g_batch : function or None
+    Optional vectorized replications, see Notes. Defaults to None.
+    ag : coroutine function or None
+    Optional asynchronous replication, see Notes. Defaults to None.
+    ag_limit : int
+    Number of `ag` replications awaited at once, at most. Defaults
+    to 16.
+    simcache : simcache.SimCache object or None
+    On-disk cache of replications, set by `set_simcache`. Defaults
+    to None.
+    simcache_version : str
+    Part of the cache key, to change whenever `g` changes so that
+    old replications are not reused. Defaults to ''.
+    bounds : list of tuple or None
+    Optional (low, high) of each component of feasible points,
+    inclusive, see Notes. Defaults to None.
 
     Parameters
     ----------
     rng : prng.MRG32k3a object
 
+    Notes
+    -----
+    An Oracle may implement `g_batch(self, x, m, rngs)`, where `rngs` is
+    a prng.MultiStreamMRG32k3a object whose stream i is the generator `g`
+    would get for replication i. It returns a bool, indicating that
+    every replication is feasible, and an (m, num_obj) NumPy array with
+    replication i in row i. `hit` and `bump` then call it once instead
+    of calling `g` m times, even when simpar is above 1.
+
+    An Oracle which waits on external simulators may implement
+    `async def ag(self, x, rng)` instead of `g`, with the same arguments
+    and return values. `hit`, `hit_many`, and `bump` then await up to
+    ag_limit replications at once on an event loop, each with its own
+    generator, and summarize them in order as if `g` had been called.
+
+    With a `simcache`, `hit`, `hit_many`, and `bump` look up each
+    replication by the class and `simcache_version` of the Oracle, the
+    point, and the seed of the replication, and only simulate those not
+    found. Since the seeds do not depend on the budget or the solver,
+    a rerun from the same seed finds the replications already taken.
+    `g` must depend on nothing but the point and the generator, and
+    `g_batch` replications are not cached.
+
+    An Oracle whose feasible points lie in a box may set `bounds`, or
+    override `is_feasible(x)` with another cheap check. It must reject
+    only points which `g` finds infeasible. `hit` and `hit_many` then
+    return points it rejects as infeasible without simulating them, and
+    `hit` stops at the first infeasible replication, moving `rng` past
+    the replications not taken so that later results are unchanged.
+    Infeasible points have the same `hit` result whether or not they
+    are simulated, see `infeasible_hit`. `bump` returns what `g` does,
+    so it simulates rejected points too.
+
     """
 
+    g_batch = None
+    ag = None
+    ag_limit = 16
+    simchunks = 8
+    simcache_version = ''
+    bounds = None
+
     def __init__(self, rng):
         self.rng = rng
         self.crnold_state = rng.getstate()
         self.crnflag = False
         self.crn_obsold = rng.getstate()
+        self.streams = None
+        self.ag_loop = None
+        self.simcache = None
         super().__init__()
 
 
-    def set_simpar(self, simpar):
+    def set_simpar(self, simpar, backend='process'):
         """
-        Intialize processes when parallel replications is enabled.
+        Intialize processes or threads when parallel replications is
+        enabled. Each process unpickles a copy of the Oracle once, with
+        the attributes it has now. Threads share the Oracle, and each
+        has its own generator.
 
         Parameters
         ----------
         simpar : int
             Number of processes to use when performing simulation replications.
+        backend : str, optional
+            'process' (default), 'thread', or 'serial', which ignores
+            simpar. Threads suit oracles which spend their time in
+            calls that release the GIL, e.g. to NumPy.
         """
+        assert(backend in simbackends)
+        self.backend = backend
         self.simpar = simpar
-        if self.simpar > 1:
+        if backend == 'serial':
+            self.simpar = 1
+        if self.simpar > 1 and backend == 'thread':
+            self.pool = ThreadPoolExecutor(max_workers=self.simpar)
+            self.pool_rngs = threading.local()
+        elif self.simpar > 1:
+            orcdump = self.mp_dumps()
             self.req_q = Queue()
             self.res_q = Queue()
+            # create shared memory before the processes start, so that
+            # they use the resource tracker of this process
+            self.obsbuf = None
+            self.mp_obsbuf(self.simchunks)
             self.proc = []
+            wargs = (self.req_q, self.res_q, orcdump)
             for i in range(self.simpar):
-                p = Process(target=mp_worker, args=(self.req_q, self.res_q))
+                p = Process(target=mp_chunkworker, args=wargs)
                 p.start()
                 self.proc.append(p)
 
@@ -1072,11 +1497,82 @@ class Oracle(object):
         Terminate all multiprocessing processes created in `__init__`. Call
         this after simulation is complete.
         """
-        if self.simpar > 1:
+        if self.ag_loop is not None:
+            self.ag_loop.close()
+            self.ag_loop = None
+        if self.simcache is not None:
+            self.simcache.close()
+        if self.simpar > 1 and self.backend == 'thread':
+            self.pool.shutdown()
+        elif self.simpar > 1:
             for p in self.proc:
                 p.terminate()
                 p.join()
+            if self.obsbuf is not None:
+                self.obsbuf.close()
+                self.obsbuf.unlink()
+                self.obsbuf = None
+
+
+    def set_simcache(self, simcache):
+        """
+        Set the on-disk cache of replications.
+
+        Parameters
+        ----------
+        simcache : simcache.SimCache object or None
+            None turns off caching
+        """
+        self.simcache = simcache
 
+    def simcache_key(self):
+        """
+        Return the key of the replications of the Oracle in `simcache`.
+
+        Returns
+        -------
+        str
+    the module and name of the class, `simcache_version`, and
+    the inverse normal cdf of `rng`
+        """
+        cls = type(self)
+        return ':'.join([cls.__module__ + '.' + cls.__qualname__, self.simcache_version, self.rng.inverse_normal])
+
+    def is_feasible(self, x):
+        """
+        Check a point against `bounds` without simulating it.
+
+        Parameters
+        ----------
+        x : tuple of int
+
+        Returns
+        -------
+        bool
+            False if 'x' is infeasible or has the wrong dimension, True
+            if it may be feasible
+        """
+        if self.bounds is None:
+            return True
+        if len(x) != len(self.bounds):
+            return False
+        return all(low <= xi <= high for xi, (low, high) in zip(x, self.bounds))
+
+    def infeasible_hit(self):
+        """
+        Return the `hit` result of an infeasible point, whatever the
+        number of replications and whether or not it was simulated.
+
+        Returns
+        -------
+        isfeas : bool
+    False
+        obmean : list
+    empty
+        obse : list
+    empty
+        """
+        return False, [], []
 
     def set_crnflag(self, crnflag):
         """
@@ -1100,12 +1596,29 @@ class Oracle(object):
         """
         self.crnold_state = old_state
 
+    def set_streams(self, node):
+        """
+        Take iteration and replication seeds from a stream tree instead
+        of legacy streams and substreams, and start at iteration 1.
+
+        Parameters
+        ----------
+        node : prng.StreamTree object
+            Trial node. Its iteration 0 is left for the solver.
+        """
+        assert(node.level_name() == 'iteration')
+        self.streams = node
+        self.crn_iter = 1
+        self.crn_rep = 0
+        self.crn_newstream(node.child(1))
+
     def crn_reset(self):
         """
         Rewind to the 'crnold_state'.
         """
         crn_state = self.crnold_state
         self.rng.setstate(crn_state)
+        self.crn_rep = 0
         self.crn_setobs()
 
     def crn_advance(self):
@@ -1113,13 +1626,43 @@ class Oracle(object):
         Jump ahead to the new crn baseline, and set the new rewind point
         """
         self.crn_check()
-        self.rng = get_next_prnstream(self.rng.get_seed(), self.crnflag)
+        if self.streams is None:
+            self.crn_newstream(stream_at(self.rng.get_seed(), 1))
+        else:
+            self.crn_iter += 1
+            self.crn_newstream(self.streams.child(self.crn_iter))
+
+    def crn_newstream(self, start):
+        """
+        Replace `rng` with a generator of the same settings at a new
+        stream, and set the new rewind point.
+
+        Parameters
+        ----------
+        start : tuple of int or prng.StreamTree object
+            Seed of the stream, or the iteration node whose replications
+            it holds
+        """
+        if self.streams is not None:
+            self.iternode = start
+            self.crn_rep = 0
+            start = start.get_seed()
+        oldrng = self.rng
+        self.rng = MRG32k3a(start)
+        self.rng.set_class_cache(self.crnflag)
+        self.rng.set_inverse_normal(oldrng.inverse_normal)
+        if self.crnflag:
+            # keep the cache limits and counts of the previous stream
+            oldrng.cache_clear()
+            self.rng.set_class_cache(True, oldrng.cache_maxsize, oldrng.cache_maxbytes, oldrng.cache_policy)
+            self.rng.cache_totals = oldrng.cache_totals
+        if oldrng.replay_flag:
+            # start the new iteration with empty replay buffers
+            self.rng.set_replay(True, oldrng.replay_maxbytes)
+            self.rng.replay_totals = oldrng.replay_totals
         new_oldstate = self.rng.getstate()
         self.set_crnold(new_oldstate)
         self.crn_obsold = new_oldstate
-        if self.crnflag:
-            self.rng.generate.cache_clear()
-            self.rng.bsm.cache_clear()
 
     def crn_check(self):
         '''
@@ -1139,11 +1682,111 @@ class Oracle(object):
         '''
         Jump to the next substream from the start of the previous.
         '''
-        state = self.crn_obsold
-        self.rng.setstate(state)
-        jump_substream(self.rng)
+        if self.streams is None:
+            state = self.crn_obsold
+            self.rng.setstate(state)
+            jump_substream(self.rng)
+        else:
+            self.crn_rep += 1
+            self.rng.seed(self.iternode.child(self.crn_rep).get_seed())
+        self.crn_setobs()
+
+    def batch_seeds(self, m):
+        """
+        Collect the seeds of the next `m` replications, leaving `rng` as
+        `m` calls to `crn_nextobs` would.
+
+        Parameters
+        ----------
+        m : int
+
+        Returns
+        -------
+        seeds : list of tuple of int
+        """
+        seeds = [self.rng.get_seed()]
+        if self.streams is None:
+            seed = self.crn_obsold[0]
+            for i in range(m):
+                seed = jump_seed(seed, a1p76, a2p76)
+                seeds.append(seed)
+        else:
+            for i in range(m):
+                self.crn_rep += 1
+                seeds.append(self.iternode.child(self.crn_rep).get_seed())
+        # the last seed starts the replication after the batch
+        self.rng.seed(seeds.pop())
+        self.crn_setobs()
+        return seeds
+
+    def skip_reps(self, m):
+        """
+        Move `rng` past the next `m` replications without taking them,
+        as `m` calls to `crn_nextobs` would.
+
+        Parameters
+        ----------
+        m : int
+        """
+        if m < 1:
+            return
+        if self.streams is None:
+            seed = self.crn_obsold[0]
+            for i in range(m):
+                seed = jump_seed(seed, a1p76, a2p76)
+        else:
+            self.crn_rep += m
+            seed = self.iternode.child(self.crn_rep).get_seed()
+        self.rng.seed(seed)
         self.crn_setobs()
 
+    def hit_seeds(self, points, m):
+        """
+        Collect the seeds of the replications of each point as `hit`
+        calls on each point in turn would, skipping the replications
+        of points rejected by `is_feasible`.
+
+        Parameters
+        ----------
+        points : list of tuple of int
+        m : int
+
+        Returns
+        -------
+        list
+    the seeds of the replications of each point, or None if
+    the point is rejected
+        """
+        allseeds = []
+        for x in points:
+            if self.is_feasible(x):
+                allseeds.append(self.batch_seeds(m))
+            else:
+                allseeds.append(None)
+                # with crn, crn_check rewinds anyway
+                if not self.crnflag:
+                    self.skip_reps(m)
+            # each point starts where a `hit` call after the previous would
+            self.crn_check()
+        return allseeds
+
+    def batch_rngs(self, m):
+        """
+        Collect the generators of the next `m` replications in lockstep
+        lanes, leaving `rng` as `m` calls to `crn_nextobs` would.
+
+        Parameters
+        ----------
+        m : int
+
+        Returns
+        -------
+        rngs : prng.MultiStreamMRG32k3a object
+        """
+        rngs = MultiStreamMRG32k3a(self.batch_seeds(m))
+        rngs.set_inverse_normal(self.rng.inverse_normal)
+        return rngs
+
     def bump(self, x, m):
         """
         Simulate 'm' replications at 'x' and return the replication
@@ -1173,6 +1816,19 @@ class Oracle(object):
             print('--* Error: Number of replications must be at least 1. ')
             print('--* Aborting. ')
             sys.exit()
+        elif self.g_batch is not None:
+            isfeas, objarr = self.g_batch(x, m, self.batch_rngs(m))
+            obs = [tuple(row) for row in objarr.tolist()]
+        elif self.simcache is not None:
+            reps = self.cache_run([(x, self.batch_seeds(m))])[0]
+            isfeas = all(isfeasi for isfeasi, objd in reps)
+            obs = [objd for isfeasi, objd in reps]
+        elif self.ag is not None:
+            reps = self.ag_run([(x, self.batch_seeds(m))])[0]
+            isfeas = all(isfeasi for isfeasi, objd in reps)
+            obs = [objd for isfeasi, objd in reps]
+        elif self.simpar > 1 and m > 1:
+            isfeas, obs = self.mp_bump(x, m)
         else:
             mr = range(m)
             feas = []
@@ -1186,74 +1842,609 @@ class Oracle(object):
         self.crn_check()
         return isfeas, obs
 
-    def hit(self, x, m):
+    def mp_bump(self, x, m):
         """
-        Generate the means and standard errors of 'm' simulation
-        replications at point 'x'.
+        Take the replications of `bump` in chunks on the parallel
+        processes or threads. Processes write the observations into
+        shared memory rather than sending them through the result queue.
 
         Parameters
         ----------
         x : tuple of int
-    point at which to simulate
-    m : int
-    number of replications to simulate 'x'
+        m : int
 
         Returns
         -------
         isfeas : bool
-    indicates the feasibility of 'x'
-        obmean : tuple of float
-    mean of each objective of 'm' simulations
-        obse : tuple of float
-    mean of standard errors of each objective of 'm' simulations
+        obs : list of tuple of float
+    list of length 'm' of simulated objective values, as the
+    serial path returns them
         """
+        chunksize = ceil(m/self.simchunks)
+        seeds = self.batch_seeds(m)
+        jobs = [(x, seeds[c:c + chunksize]) for c in range(0, m, chunksize)]
+        reps = [None]*m
+        results = self.run_chunks(jobs, reps)
+        isfeas = all(isfeasc for isfeasc, summc in results)
+        obs = [objd for isfeasi, objd in reps]
+        return isfeas, obs
 
-        d = self.num_obj
-        dr = range(d)
-        isfeas = False
-        obmean = []
-        obse = []
-        mr = range(m)
-        assert(m >= 1)
-        if m == 1:
-            isfeas, objd = self.g(x, self.rng)
-            obmean = objd
-            obse = [0 for o in objd]
+    def mp_dumps(self):
+        """
+        Pickle the Oracle for the processes of `set_simpar`, with a new
+        generator and without the processes, threads, and event loop of
+        this one.
+
+        Returns
+        -------
+        bytes
+        """
+        orc = object.__new__(type(self))
+        orc.__dict__.update(self.__dict__)
+        for name in mp_localattrs:
+            orc.__dict__.pop(name, None)
+        orc.rng = type(self.rng)()
+        orc.crnflag = False
+        orc.simpar = 1
+        orc.backend = 'serial'
+        orc.ag_loop = None
+        return pickle.dumps(orc)
+
+    def mp_obsbuf(self, m):
+        """
+        Make sure the shared memory for parallel observations holds at
+        least `m` replications, growing it by doubling. Without shared
+        memory, i.e. before Python 3.8, it does nothing.
+
+        Parameters
+        ----------
+        m : int
+
+        Returns
+        -------
+        cap : int
+    Number of replications, i.e. rows of num_obj doubles, the
+    shared memory holds
+        """
+        if shared_memory is None:
+            return 0
+        d = self.num_obj
+        cap = 0
+        if self.obsbuf is not None:
+            cap = self.obsbuf_cap
+        if cap < m:
+            cap = max(m, 2*cap)
+            if self.obsbuf is not None:
+                self.obsbuf.close()
+                self.obsbuf.unlink()
+            self.obsbuf = shared_memory.SharedMemory(create=True, size=8*d*cap)
+            self.obsbuf_cap = cap
+        return cap
+
+    def hit(self, x, m):
+        """
+        Generate the means and standard errors of 'm' simulation
+        replications at point 'x'.
+
+        Parameters
+        ----------
+        x : tuple of int
+    point at which to simulate
+    m : int
+    number of replications to simulate 'x'
+
+        Returns
+        -------
+        isfeas : bool
+    indicates the feasibility of 'x'
+        obmean : tuple of float
+    mean of each objective of 'm' simulations, empty if 'x' is
+    infeasible
+        obse : tuple of float
+    mean of standard errors of each objective of 'm' simulations,
+    empty if 'x' is infeasible
+        """
+
+        d = self.num_obj
+        dr = range(d)
+        isfeas = False
+        obmean = []
+        obse = []
+        mr = range(m)
+        assert(m >= 1)
+        if not self.is_feasible(x):
+            if not self.crnflag:
+                self.skip_reps(m)
+            self.crn_check()
+            return self.infeasible_hit()
+        if self.g_batch is not None:
+            isfeas, objarr = self.g_batch(x, m, self.batch_rngs(m))
+            if m == 1 and isfeas:
+                obmean = tuple(objarr[0].tolist())
+                obse = [0 for o in obmean]
+            elif isfeas:
+                summ = ReplicationSummary(d)
+                summ.add_array(objarr)
+                obmean = summ.mean()
+                obse = summ.stderr()
+        elif self.simcache is not None:
+            return self.cache_hit_many([x], m)[0]
+        # an oracle with only `ag` has no `g` to call, even for m == 1
+        elif self.ag is not None:
+            return self.ag_hit_many([x], m)[0]
+        elif m == 1:
+            isfeas, objd = self.g(x, self.rng)
+            if isfeas:
+                obmean = objd
+                obse = [0 for o in objd]
             self.crn_nextobs()
+        # take replications in parallel
+        elif self.simpar > 1:
+            return self.mp_hit_many([x], m)[0]
         else:
-            feas = []
-            objm = []
-            # take replications in parallel
-            if self.simpar > 1:
-                for i in mr:
-                    # we will reconstruct objects within `mp_replicate` and then
-                    # compute the replications in parallel
-                    orccls = type(self)
-                    rngcls = type(self.rng)
-                    cseed = self.rng.get_seed()
-                    proc_job = (mp_replicate, (orccls, x, rngcls, cseed))
-                    self.req_q.put(proc_job)
-                    self.crn_nextobs()
-                for i in mr:
-                    # block until parallel results are ready
-                    isfeasi, oval = self.res_q.get()
-                    feas.append(isfeasi)
-                    objm.append(oval)
-            # do not take replications in parallel
-            else:
-                for i in mr:
-                    isfeasi, oval = self.g(x, self.rng)
-                    feas.append(isfeasi)
-                    objm.append(oval)
-                    self.crn_nextobs()
-            if all(feas):
-                isfeas = True
-                obmean = tuple([mean([objm[i][k] for i in mr]) for k in dr])
-                obvar = [variance([objm[i][k] for i in mr], obmean[k]) for k in dr]
-                obse = tuple([sqrt(obvar[i]/m) for i in dr])
+            isfeas = True
+            summ = ReplicationSummary(d)
+            chunk = ReplicationSummary(d)
+            chunksize = ceil(m/self.simchunks)
+            for i in mr:
+                isfeasi, oval = self.g(x, self.rng)
+                self.crn_nextobs()
+                if not isfeasi:
+                    # later replications cannot make x feasible
+                    isfeas = False
+                    if not self.crnflag:
+                        self.skip_reps(m - i - 1)
+                    break
+                chunk.add(oval)
+                # merge chunks as the parallel processes would
+                if (i + 1) % chunksize == 0 or i + 1 == m:
+                    summ.merge(chunk)
+                    chunk = ReplicationSummary(d)
+            if isfeas:
+                obmean = summ.mean()
+                obse = summ.stderr()
         self.crn_check()
         return isfeas, obmean, obse
 
+    def hit_many(self, points, m):
+        """
+        Generate the means and standard errors of 'm' simulation
+        replications at each of several points, using the same
+        replications as calling `hit` on each point in turn.
+
+        Parameters
+        ----------
+        points : list of tuple of int
+    points at which to simulate, in order
+    m : int
+    number of replications to simulate each point
+
+        Returns
+        -------
+        list of tuple
+    the `hit` result (isfeas, obmean, obse) of each point, in order
+
+        See also
+        --------
+        hit
+        """
+        if self.g_batch is None and self.simcache is not None:
+            return self.cache_hit_many(points, m)
+        if self.g_batch is None and self.ag is not None:
+            return self.ag_hit_many(points, m)
+        if self.simpar > 1 and self.g_batch is None and m > 1:
+            return self.mp_hit_many(points, m)
+        return [self.hit(x, m) for x in points]
+
+    def mp_hit_many(self, points, m):
+        """
+        Send the replications of all points to the parallel processes or
+        threads at once as chunks of seeds, then merge the chunk
+        summaries of each point in order.
+
+        Parameters
+        ----------
+        points : list of tuple of int
+        m : int
+
+        Returns
+        -------
+        list of tuple
+    the `hit` result (isfeas, obmean, obse) of each point, in order
+        """
+        d = self.num_obj
+        chunksize = ceil(m/self.simchunks)
+        allseeds = self.hit_seeds(points, m)
+        jobs = []
+        jobpts = []
+        for pt, (x, seeds) in enumerate(zip(points, allseeds)):
+            if seeds is None:
+                continue
+            for c in range(0, m, chunksize):
+                jobs.append((x, seeds[c:c + chunksize]))
+                jobpts.append(pt)
+        feas = [seeds is not None for seeds in allseeds]
+        summs = [ReplicationSummary(d) for x in points]
+        for pt, (isfeasc, summc) in zip(jobpts, self.run_chunks(jobs)):
+            feas[pt] = feas[pt] and isfeasc
+            summs[pt].merge(summc)
+        results = []
+        for isfeas, summ in zip(feas, summs):
+            if isfeas:
+                results.append((True, summ.mean(), summ.stderr()))
+            else:
+                results.append((False, [], []))
+        return results
+
+    def ag_hit_many(self, points, m):
+        """
+        Await the `ag` replications of all points together, then
+        summarize those of each point as `hit` would.
+
+        Parameters
+        ----------
+        points : list of tuple of int
+        m : int
+
+        Returns
+        -------
+        list of tuple
+    the `hit` result (isfeas, obmean, obse) of each point, in order
+        """
+        allseeds = self.hit_seeds(points, m)
+        jobs = [(x, seeds) for x, seeds in zip(points, allseeds) if seeds is not None]
+        allreps = iter(self.ag_run(jobs))
+        return [self.infeasible_hit() if seeds is None else self.reps_hit(next(allreps)) for seeds in allseeds]
+
+    def cache_hit_many(self, points, m):
+        """
+        Look up the replications of all points in `simcache`, simulate
+        those not found together, then summarize those of each point as
+        `hit` would.
+
+        Parameters
+        ----------
+        points : list of tuple of int
+        m : int
+
+        Returns
+        -------
+        list of tuple
+    the `hit` result (isfeas, obmean, obse) of each point, in order
+        """
+        allseeds = self.hit_seeds(points, m)
+        jobs = [(x, seeds) for x, seeds in zip(points, allseeds) if seeds is not None]
+        allreps = iter(self.cache_run(jobs))
+        return [self.infeasible_hit() if seeds is None else self.reps_hit(next(allreps)) for seeds in allseeds]
+
+    def reps_hit(self, reps):
+        """
+        Summarize the replications of a point as `hit` would.
+
+        Parameters
+        ----------
+        reps : list of tuple
+    the (isfeas, objd) of each replication, in order
+
+        Returns
+        -------
+        isfeas : bool
+        obmean : tuple of float
+        obse : tuple of float
+        """
+        d = self.num_obj
+        m = len(reps)
+        isfeas = all(isfeasi for isfeasi, objd in reps)
+        if not isfeas:
+            return self.infeasible_hit()
+        if m == 1:
+            objd = reps[0][1]
+            return isfeas, objd, [0 for o in objd]
+        # merge chunks as the serial path does
+        chunksize = ceil(m/self.simchunks)
+        summ = ReplicationSummary(d)
+        for c in range(0, m, chunksize):
+            chunk = ReplicationSummary(d)
+            for isfeasi, objd in reps[c:c + chunksize]:
+                chunk.add(objd)
+            summ.merge(chunk)
+        return True, summ.mean(), summ.stderr()
+
+    def cache_run(self, jobs):
+        """
+        Look up replications in `simcache`, and take and store those
+        not found with `replicate_each`.
+
+        Parameters
+        ----------
+        jobs : list of tuple
+    (x, seeds) of a point and the seeds of its replications
+
+        Returns
+        -------
+        list of list of tuple
+    the (isfeas, objd) of each replication of each point, in order
+        """
+        key = self.simcache_key()
+        found = self.simcache.get_many(key, [(x, seed) for x, seeds in jobs for seed in seeds])
+        results = []
+        missing = []
+        start = 0
+        for x, seeds in jobs:
+            reps = found[start:start + len(seeds)]
+            start += len(seeds)
+            results.append(reps)
+            seedsx = [seed for seed, rep in zip(seeds, reps) if rep is None]
+            if seedsx:
+                missing.append((x, seedsx))
+        if not missing:
+            return results
+        new = []
+        for (x, seeds), reps in zip(missing, self.replicate_each(missing)):
+            new.extend((x, seed, isfeas, objd) for seed, (isfeas, objd) in zip(seeds, reps))
+        self.simcache.put_many(key, new)
+        # fill the gaps in order
+        fresh = iter(new)
+        for reps in results:
+            for i, rep in enumerate(reps):
+                if rep is None:
+                    x, seed, isfeas, objd = next(fresh)
+                    reps[i] = isfeas, objd
+        return results
+
+    def replicate_each(self, jobs):
+        """
+        Take the replications of several points, keeping the result of
+        each replication, on the event loop, the parallel processes or
+        threads, or in turn.
+
+        Parameters
+        ----------
+        jobs : list of tuple
+    (x, seeds) of a point and the seeds of its replications
+
+        Returns
+        -------
+        list of list of tuple
+    the (isfeas, objd) of each replication of each point, in order
+        """
+        if self.ag is not None:
+            return self.ag_run(jobs)
+        results = []
+        if self.simpar > 1:
+            chunks = []
+            for x, seeds in jobs:
+                chunksize = ceil(len(seeds)/self.simchunks)
+                chunks.extend((x, seeds[c:c + chunksize]) for c in range(0, len(seeds), chunksize))
+            reps = [None]*sum(len(seeds) for x, seeds in jobs)
+            self.run_chunks(chunks, reps)
+            start = 0
+            for x, seeds in jobs:
+                results.append(reps[start:start + len(seeds)])
+                start += len(seeds)
+            return results
+        rng = type(self.rng)()
+        rng.set_inverse_normal(self.rng.inverse_normal)
+        for x, seeds in jobs:
+            reps = []
+            for seed in seeds:
+                rng.seed(seed)
+                reps.append(self.g(x, rng))
+            results.append(reps)
+        return results
+
+    def ag_run(self, jobs):
+        """
+        Run the `ag` replications of several points on the event loop of
+        the Oracle.
+
+        Parameters
+        ----------
+        jobs : list of tuple
+    (x, seeds) of a point and the seeds of its replications
+
+        Returns
+        -------
+        list of list of tuple
+    the (isfeas, objd) of each replication of each point, in order
+        """
+        if self.ag_loop is None:
+            self.ag_loop = asyncio.new_event_loop()
+        reps = self.ag_loop.run_until_complete(self.ag_gather(jobs))
+        results = []
+        start = 0
+        for x, seeds in jobs:
+            results.append(reps[start:start + len(seeds)])
+            start += len(seeds)
+        return results
+
+    async def ag_gather(self, jobs):
+        """
+        Await every replication of several points, at most `ag_limit`
+        at once.
+
+        Parameters
+        ----------
+        jobs : list of tuple
+    (x, seeds) of a point and the seeds of its replications
+
+        Returns
+        -------
+        list of tuple
+    the (isfeas, objd) of each replication, in order
+        """
+        limit = asyncio.Semaphore(self.ag_limit)
+        invnorm = self.rng.inverse_normal
+        reps = []
+        for x, seeds in jobs:
+            for seed in seeds:
+                reps.append(self.ag_replicate(limit, x, seed, invnorm))
+        return await asyncio.gather(*reps)
+
+    async def ag_replicate(self, limit, x, seed, invnorm):
+        """
+        Await one `ag` replication with a generator at `seed`.
+
+        Parameters
+        ----------
+        limit : asyncio.Semaphore object
+        x : tuple of int
+        seed : tuple of int
+        invnorm : str
+
+        Returns
+        -------
+        isfeas : bool
+        objd : tuple of float
+        """
+        async with limit:
+            rng = type(self.rng)(seed)
+            rng.set_inverse_normal(invnorm)
+            return await self.ag(x, rng)
+
+    def run_chunks(self, jobs, obs=None):
+        """
+        Simulate chunks of replications with `replicate_chunk` on the
+        parallel processes or threads.
+
+        Parameters
+        ----------
+        jobs : list of tuple
+    chunks (x, seeds) of a point and the seeds of its replications
+    obs : list, optional
+    if given, filled with the (isfeas, objd) of each replication
+    of the chunks in order, instead of summarizing them
+
+        Returns
+        -------
+        list of tuple
+    the (isfeas, summary) of each chunk, in order, with no summary
+    if 'obs' is given
+        """
+        invnorm = self.rng.inverse_normal
+        rows = []
+        row = 0
+        for x, seeds in jobs:
+            rows.append(row)
+            row += len(seeds)
+        if self.backend == 'thread':
+            futures = []
+            for (x, seeds), row in zip(jobs, rows):
+                futures.append(self.pool.submit(self.thread_chunk, x, seeds, invnorm, obs is not None))
+            results = []
+            for future, row in zip(futures, rows):
+                isfeasc, summc, obsc = future.result()
+                if obs is not None:
+                    obs[row:row + len(obsc)] = obsc
+                    summc = None
+                results.append((isfeasc, summc))
+            return results
+        if obs is not None:
+            self.mp_obsbuf(row)
+        for tag, (x, seeds) in enumerate(jobs):
+            obsbuf = None
+            if obs is not None and self.obsbuf is None:
+                obsbuf = (None, rows[tag])
+            elif obs is not None:
+                obsbuf = (self.obsbuf.name, rows[tag])
+            self.req_q.put((tag, x, seeds, invnorm, obsbuf))
+        results = [None]*len(jobs)
+        err = None
+        for j in range(len(jobs)):
+            # block until parallel results are ready
+            tag, isfeasc, summc = self.res_q.get()
+            if isinstance(isfeasc, Exception):
+                err = isfeasc
+            results[tag] = isfeasc, summc
+        # raise simulation errors once the queue holds no more results
+        if err is not None:
+            raise err
+        if obs is not None and self.obsbuf is None:
+            for tag, (isfeasc, obsc) in enumerate(results):
+                obs[rows[tag]:rows[tag] + len(obsc)] = obsc
+                results[tag] = isfeasc, None
+        elif obs is not None:
+            d = self.num_obj
+            vals = unpack_from('%dd' % (row*d), self.obsbuf.buf)
+            obs[:] = [(True, vals[i*d:(i + 1)*d]) for i in range(row)]
+            for tag, (isfeasc, infeas) in enumerate(results):
+                for i, oval in infeas:
+                    obs[rows[tag] + i] = False, oval
+                results[tag] = isfeasc, None
+        return results
+
+    def thread_chunk(self, x, seeds, invnorm, keepobs):
+        """
+        Run `replicate_chunk` on a generator of the calling thread.
+
+        Parameters
+        ----------
+        x : tuple of int
+        seeds : list of tuple of int
+        invnorm : str
+        keepobs : bool
+    True to return the observations
+
+        Returns
+        -------
+        isfeas : bool
+        summ : ReplicationSummary object
+        obs : list of tuple or None
+        """
+        rng = getattr(self.pool_rngs, 'rng', None)
+        if rng is None:
+            rng = type(self.rng)()
+            self.pool_rngs.rng = rng
+        rng.set_inverse_normal(invnorm)
+        obs = None
+        if keepobs:
+            obs = []
+        isfeas, summ = self.replicate_chunk(x, seeds, rng, obs)
+        return isfeas, summ, obs
+
+    def replicate_chunk(self, x, seeds, rng, obs=None):
+        """
+        Simulate a replication at 'x' from each seed, and summarize them.
+
+        Parameters
+        ----------
+        x : tuple of int
+    point at which to simulate
+    seeds : list of tuple of int
+    seed of each replication
+    rng : prng.MRG32k3a object
+    generator to seed for each replication
+    obs : list, optional
+    if given, the (isfeas, objd) of each replication are appended
+    to it, with 'objd' as `g` returned it if infeasible, instead
+    of summarizing them
+
+        Returns
+        -------
+        isfeas : bool
+    True if every replication is feasible
+        summ : ReplicationSummary object
+    summary of the replications
+        """
+        d = self.num_obj
+        isfeas = True
+        summ = ReplicationSummary(d)
+        for seed in seeds:
+            rng.seed(seed)
+            isfeasi, oval = self.g(x, rng)
+            if not isfeasi:
+                isfeas = False
+                # the chunk is infeasible whatever its other replications
+                if obs is None:
+                    break
+            if obs is not None:
+                if isfeasi:
+                    oval = tuple(oval)
+                obs.append((isfeasi, oval))
+            elif isfeasi:
+                summ.add(oval)
+        return isfeas, summ
+
     def g(self, x, rng):
         """
         Generate a single replication at point `x`.
@@ -1271,3 +2462,329 @@ class Oracle(object):
             The simulated values for each objective
         """
         raise NotImplementedError
+
+
+class ExternalOracle(Oracle):
+    """
+    Base class for Oracles whose replications are taken by an external
+    simulator program, kept running in a pool of subprocesses.
+
+    Attributes
+    ----------
+    sim_args : list of str
+    Command which starts the simulator. Required.
+    sim_block : int
+    Number of requests written to a simulator before reading its
+    responses. Defaults to 64.
+    sim_retries : int
+    Number of times a block is sent again to a restarted simulator
+    after one dies, before giving up. Defaults to 3.
+    num_sims : int
+    Number of simulators, set by `set_simpar`. Defaults to 1.
+
+    Parameters
+    ----------
+    rng : prng.MRG32k3a object
+
+    See also
+    --------
+    Oracle
+
+    Notes
+    -----
+    The simulator reads requests from stdin, one line per replication,
+    of the `dim` components of the point followed by the 6 integers of
+    an `mrg32k3a` seed, separated by spaces. It must seed its generator
+    with the seed, take one replication, and write a line of 1 and the
+    `num_obj` objective values if the point is feasible, or a line of
+    0 otherwise, then flush stdout. It runs until stdin is closed.
+    Subclasses may override `format_request` and `parse_response` to
+    use another line format.
+
+    Replications are taken in the chunks of `Oracle.hit`, and sent to
+    `simpar` simulators at once, restarting any that die. The seed of
+    each replication, and so the results, do not depend on which
+    simulator took it.
+    """
+
+    sim_args = None
+    sim_block = 64
+    sim_retries = 3
+
+    def __init__(self, rng):
+        self.sims = None
+        self.num_sims = 1
+        super().__init__(rng)
+
+    def set_simpar(self, simpar, backend='process'):
+        """
+        Set the number of simulator subprocesses, which start when first
+        needed, in place of parallel processes or threads.
+
+        Parameters
+        ----------
+        simpar : int
+            Number of simulators to run at once
+        backend : str, optional
+            'serial' runs one simulator, otherwise ignored
+        """
+        self.num_sims = simpar
+        if backend == 'serial':
+            self.num_sims = 1
+        super().set_simpar(1, backend)
+
+    def mp_cleanup(self):
+        """
+        Stop the simulators. Call this after simulation is complete.
+        """
+        if self.sims is not None:
+            self.pool.shutdown()
+            while not self.sims.empty():
+                self.sim_stop(self.sims.get())
+            self.sims = None
+        super().mp_cleanup()
+
+    def sim_start(self):
+        """
+        Start a simulator.
+
+        Returns
+        -------
+        subprocess.Popen object
+        """
+        assert(self.sim_args)
+        return subprocess.Popen(self.sim_args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, universal_newlines=True)
+
+    def sim_stop(self, sim):
+        """
+        Close the stdin of a simulator and wait for it to exit, killing
+        it if it does not.
+
+        Parameters
+        ----------
+        sim : subprocess.Popen object
+        """
+        try:
+            sim.stdin.close()
+            sim.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            sim.kill()
+            sim.wait()
+        sim.stdout.close()
+
+    def sim_pool(self):
+        """
+        Start the simulators and the threads which talk to them, if not
+        yet started.
+        """
+        if self.sims is None:
+            nsims = max(self.num_sims, 1)
+            self.sims = queue.Queue()
+            for i in range(nsims):
+                self.sims.put(self.sim_start())
+            self.pool = ThreadPoolExecutor(max_workers=nsims)
+
+    def format_request(self, x, seed):
+        """
+        Return the request line of a replication.
+
+        Parameters
+        ----------
+        x : tuple of int
+        seed : tuple of int
+
+        Returns
+        -------
+        str
+        """
+        return ' '.join(map(str, tuple(x) + tuple(seed))) + '\n'
+
+    def parse_response(self, line):
+        """
+        Return the replication of a response line.
+
+        Parameters
+        ----------
+        line : str
+
+        Returns
+        -------
+        isfeas : bool
+        objd : tuple of float
+            The objective values, or None for each if not feasible
+        """
+        fields = line.split()
+        if fields[0] == '1':
+            return True, tuple(float(v) for v in fields[1:self.num_obj + 1])
+        return False, tuple(None for k in range(self.num_obj))
+
+    def sim_replicate(self, x, seeds):
+        """
+        Take a replication at `x` from each seed on an idle simulator,
+        restarting it if it dies.
+
+        Parameters
+        ----------
+        x : tuple of int
+        seeds : list of tuple of int
+
+        Returns
+        -------
+        list of tuple
+            The (isfeas, objd) of each replication, in order
+        """
+        sim = self.sims.get()
+        reps = []
+        try:
+            block = self.sim_block
+            for b in range(0, len(seeds), block):
+                requests = ''.join(self.format_request(x, seed) for seed in seeds[b:b + block])
+                nreq = len(seeds[b:b + block])
+                tries = 0
+                while True:
+                    try:
+                        sim.stdin.write(requests)
+                        sim.stdin.flush()
+                        lines = [sim.stdout.readline() for i in range(nreq)]
+                        if all(lines):
+                            break
+                    except (BrokenPipeError, OSError):
+                        pass
+                    # the simulator died, so send the block to a new one
+                    tries += 1
+                    self.sim_stop(sim)
+                    sim = self.sim_start()
+                    if tries > self.sim_retries:
+                        raise RuntimeError('simulator %s exited %d times' % (self.sim_args, tries))
+                reps.extend(self.parse_response(line) for line in lines)
+        finally:
+            self.sims.put(sim)
+        return reps
+
+    def sim_run(self, jobs):
+        """
+        Take the replications of several chunks on the simulators.
+
+        Parameters
+        ----------
+        jobs : list of tuple
+            (x, seeds) of a point and the seeds of its replications
+
+        Returns
+        -------
+        list of list of tuple
+            The (isfeas, objd) of each replication of each chunk
+        """
+        self.sim_pool()
+        futures = [self.pool.submit(self.sim_replicate, x, seeds) for x, seeds in jobs]
+        return [future.result() for future in futures]
+
+    def run_chunks(self, jobs, obs=None):
+        """
+        Simulate chunks of replications on the simulators, and summarize
+        each as `Oracle.replicate_chunk` would.
+
+        Parameters
+        ----------
+        jobs : list of tuple
+            (x, seeds) of a point and the seeds of its replications
+        obs : list, optional
+            If given, filled with the (isfeas, objd) of each replication
+            of the chunks in order, instead of summarizing them
+
+        Returns
+        -------
+        list of tuple
+            The (isfeas, summary) of each chunk, in order, with no
+            summary if `obs` is given
+        """
+        results = []
+        allreps = []
+        for reps in self.sim_run(jobs):
+            summ = ReplicationSummary(self.num_obj)
+            isfeas = True
+            for isfeasi, objd in reps:
+                if not isfeasi:
+                    isfeas = False
+                elif obs is None:
+                    summ.add(objd)
+            allreps.extend(reps)
+            if obs is not None:
+                summ = None
+            results.append((isfeas, summ))
+        if obs is not None:
+            obs[:] = allreps
+        return results
+
+    def hit(self, x, m):
+        """
+        Generate the means and standard errors of 'm' simulation
+        replications at point 'x' on the simulators.
+
+        See also
+        --------
+        Oracle.hit
+        """
+        if m == 1 or self.g_batch is not None or self.ag is not None or self.simcache is not None:
+            return super().hit(x, m)
+        return self.mp_hit_many([x], m)[0]
+
+    def hit_many(self, points, m):
+        """
+        Generate the `hit` result of several points, sending the
+        replications of all of them to the simulators at once.
+
+        See also
+        --------
+        Oracle.hit_many
+        """
+        if m == 1 or self.g_batch is not None or self.ag is not None or self.simcache is not None:
+            return super().hit_many(points, m)
+        return self.mp_hit_many(points, m)
+
+    def bump(self, x, m):
+        """
+        Simulate 'm' replications at 'x' on the simulators and return
+        the replication values as a list.
+
+        See also
+        --------
+        Oracle.bump
+        """
+        if m == 1 or self.g_batch is not None or self.ag is not None or self.simcache is not None:
+            return super().bump(x, m)
+        isfeas, obs = self.mp_bump(x, m)
+        self.crn_check()
+        return isfeas, obs
+
+    def replicate_each(self, jobs):
+        """
+        Take the replications of several points on the simulators,
+        keeping the result of each replication.
+
+        See also
+        --------
+        Oracle.replicate_each
+        """
+        if self.ag is not None:
+            return super().replicate_each(jobs)
+        return self.sim_run(jobs)
+
+    def g(self, x, rng):
+        """
+        Take a single replication at `x` on a simulator, from the
+        current seed of `rng`.
+
+        Parameters
+        ----------
+        x : tuple
+        rng : random.Random object
+
+        Returns
+        -------
+        bool
+            Indicates feasibility of `x`
+        tuple of float
+            The simulated values for each objective
+        """
+        return self.sim_run([(x, [rng.get_seed()])])[0][0]
@@ -9,6 +9,7 @@ solve
 testsolve
 get_testsolve_prnstreams
 get_solv_prnstreams
+get_tree_prnstreams
 do_work
 combine_runs
 isp_run
@@ -38,7 +39,8 @@ from itertools import product, filterfalse
 from math import ceil, floor, sqrt
 import multiprocessing as mp
 from statistics import mean, variance
-from .prng.mrg32k3a import MRG32k3a, get_next_prnstream
+from .prng.mrg32k3a import MRG32k3a, StreamTree, get_next_prnstream, stream_at
+from .simcache import SimCache
 
 
 def solve(problem, solver, x0, **kwargs):
@@ -63,20 +65,34 @@ def solve(problem, solver, x0, **kwargs):
     budget = kwargs.pop('budget')
     seed = kwargs.pop('seed')
     simpar = kwargs.pop('simpar')
+    backend = kwargs.pop('backend', 'process')
     crn = kwargs.pop('crn')
+    crn_replay = kwargs.pop('crn_replay', False)
+    invnorm = kwargs.pop('invnorm', 'bsm')
+    tree = kwargs.pop('tree', False)
+    simcache = kwargs.pop('simcache', None)
     paramtups = []
     for i, p in enumerate(kwargs):
         ptup = (p, float(kwargs[p]))
         paramtups.append(ptup)
     ## generate all prn streams
-    solvstream = MRG32k3a(seed)
-    orcstream = get_next_prnstream(seed, crn)
-    orcstream, solvstream = get_solv_prnstreams(seed, crn)
+    if tree:
+        trials, solvstreams, x0stream, endseed = get_tree_prnstreams(1, seed, crn)
+        solvstream = solvstreams[0]
+        orcstream = trials[0].child(1).rng(crn)
+    else:
+        orcstream, solvstream = get_solv_prnstreams(seed, crn)
+    orcstream.set_replay(crn and crn_replay)
+    orcstream.set_inverse_normal(invnorm)
     ## generate the experiment list
     paramlst = [('solvprn', solvstream), ('x0', x0), ]
     orc = problem(orcstream)
     orc.set_crnflag(crn)
-    orc.set_simpar(simpar)
+    if tree:
+        orc.set_streams(trials[0])
+    orc.set_simpar(simpar, backend)
+    if simcache:
+        orc.set_simcache(SimCache(simcache))
     ## create arguments for (unknown) optional named parameters
     if paramtups:
         paramlst.extend(paramtups)
@@ -84,7 +100,9 @@ def solve(problem, solver, x0, **kwargs):
     res = isp_run(solver, budget, orc, **paramargs)
     orc.mp_cleanup()
     lastnu = len(res['itersoln']) - 1
-    return res['itersoln'][lastnu], res['endseed']
+    if not tree:
+        endseed = res['endseed']
+    return res['itersoln'][lastnu], endseed
 
 
 def testsolve(tester, solver, x0, **kwargs):
@@ -114,11 +132,22 @@ def testsolve(tester, solver, x0, **kwargs):
     proc = kwargs.pop('proc')
     ranx0 = kwargs.pop('ranx0')
     crn = kwargs.pop('crn')
+    crn_replay = kwargs.pop('crn_replay', False)
+    invnorm = kwargs.pop('invnorm', 'bsm')
+    tree = kwargs.pop('tree', False)
+    simcache = kwargs.pop('simcache', None)
     paramtups = []
     for i, p in enumerate(kwargs):
         ptup = (p, float(kwargs[p]))
         paramtups.append(ptup)
-    orcstreams, solvstreams, x0stream, endseed = get_testsolve_prnstreams(isp, seed, crn)
+    if tree:
+        trials, solvstreams, x0stream, endseed = get_tree_prnstreams(isp, seed, crn)
+        orcstreams = [trial.child(1).rng(crn) for trial in trials]
+    else:
+        orcstreams, solvstreams, x0stream, endseed = get_testsolve_prnstreams(isp, seed, crn)
+    for orcprn in orcstreams:
+        orcprn.set_replay(crn and crn_replay)
+        orcprn.set_inverse_normal(invnorm)
     joblist = []
     currtest = tester()
     orclst = []
@@ -128,7 +157,12 @@ def testsolve(tester, solver, x0, **kwargs):
         paramlst = [('solvprn', solvstreams[i]), ('x0', x0), ]
         orc = currtest.ranorc(orcstreams[i])
         orc.set_crnflag(crn)
+        if tree:
+            orc.set_streams(trials[i])
         orc.set_simpar(1)
+        if simcache:
+            # each worker opens its own connection to the shared file
+            orc.set_simcache(SimCache(simcache))
         orclst.append(orc)
         ## create arguments for (unknown) optional named parameters
         if paramtups:
@@ -170,16 +204,15 @@ def get_testsolve_prnstreams(num_trials, iseed, crn):
     orcprn_lst = []
     solprn_lst = []
     for t in range(num_trials):
-        solprn = get_next_prnstream(iseed, False)
-        iseed = solprn.get_seed()
-        solprn_lst.append(solprn)
+        iseed = stream_at(iseed, 1)
+        solprn_lst.append(MRG32k3a(iseed))
     for t in range(num_trials):
-        orcprn = get_next_prnstream(iseed, crn)
-        iseed = orcprn.get_seed()
+        iseed = stream_at(iseed, 1)
+        orcprn = MRG32k3a(iseed)
+        orcprn.set_class_cache(crn)
         orcprn_lst.append(orcprn)
-        for i in range(max_RI):
-            newprn = get_next_prnstream(iseed, crn)
-            iseed = newprn.get_seed()
+        # skip the streams reserved for the oracle's iterations
+        iseed = stream_at(iseed, max_RI)
     return orcprn_lst, solprn_lst, xprn, iseed
 
 
@@ -205,6 +238,42 @@ def get_solv_prnstreams(iseed, crn):
     return orcstream, solvstream
 
 
+def get_tree_prnstreams(num_trials, iseed, crn):
+    """
+    Lay out the random number streams of an experiment as a stream tree,
+    in which trials, iterations and replications never overlap.
+
+    Parameters
+    ----------
+    num_trials : int
+        Number of independent sample paths of Oracles
+    iseed : tuple of int
+        Seed of the experiment
+    crn : bool
+        Indicate whether CRN is on or off
+
+    Returns
+    -------
+    trials : list of prng.StreamTree objects
+        Trial nodes for `Oracle.set_streams`, i.e. trials 1 to num_trials
+    solprn_lst : list of prng.MRG32k3a objects
+        Generators at iteration 0 of every trial
+    xprn : prng.MRG32k3a object
+        Generator at trial 0, for choosing starting points
+    iseed : tuple of int
+        Seed just past the experiment
+
+    See also
+    --------
+    prng.StreamTree
+    """
+    root = StreamTree(iseed)
+    trials = root.children(1, num_trials)
+    solprn_lst = [trial.child(0).rng() for trial in trials]
+    xprn = root.child(0).rng()
+    return trials, solprn_lst, xprn, root.next_seed()
+
+
 def do_work(func, args, kwargs=None):
     """
     Wrap a function with arguments and return the result for
@@ -632,7 +701,7 @@ def get_nondom(edict):
     return set(Mpts)
 
 
-def get_nbors(x, r=1):
+def get_nbors(x, r=1, keep=None):
     """
     Find all neighbors of a point.
 
@@ -642,6 +711,9 @@ def get_nbors(x, r=1):
         A point
     r : int
         radius of the neighborhood
+    keep : function, optional
+        If given, only neighbors for which it returns True are kept,
+        e.g. `Oracle.is_feasible`
 
     Returns
     -------
@@ -663,6 +735,9 @@ def get_nbors(x, r=1):
     boxpts = product(*bounds)
     # remove those farther than r from x and return the list of neighbors
     nbors = set(filterfalse(edist_filter, boxpts))
+    if keep is not None:
+        # remove in place, which keeps the iteration order of the rest
+        nbors -= set(filterfalse(keep, nbors))
     return set(nbors)
 
 
@@ -682,7 +757,7 @@ def argsort(seq):
     return sorted(range(len(seq)), key=seq.__getitem__)
 
 
-def get_setnbors(mcs, r):
+def get_setnbors(mcs, r, keep=None):
     """
     Generate the exclusive neighborhood of a set.
 
@@ -692,6 +767,8 @@ def get_setnbors(mcs, r):
         Set of points
     r : float
         Radius of neighborhood
+    keep : function, optional
+        If given, only neighbors for which it returns True are kept
 
     Returns
     -------
@@ -700,7 +777,7 @@ def get_setnbors(mcs, r):
     """
     set_nbors = set()
     for x in mcs:
-        set_nbors |= get_nbors(x, r)
+        set_nbors |= get_nbors(x, r, keep)
     return set_nbors - mcs
 
 
@@ -3,11 +3,11 @@ pymoso
 
 Usage:
   pymoso listitems
-  pymoso solve [--budget=B] [--odir=D] [--crn] [--simpar=P]
+  pymoso solve [--budget=B] [--odir=D] [--crn] [--simpar=P] [--backend=K] [--invnorm=N] [--tree] [--simcache]
     [(--seed <s> <s> <s> <s> <s> <s>)] [(--param <param> <val>)]...
     <problem> <solver> <x>...
   pymoso testsolve [--budget=B] [--odir=D] [--crn] [--isp=T] [--proc=Q]
-    [--metric] [(--seed <s> <s> <s> <s> <s> <s>)] [(--param <param> <val>)]...
+    [--invnorm=N] [--tree] [--simcache] [--metric] [(--seed <s> <s> <s> <s> <s> <s>)] [(--param <param> <val>)]...
     <tester> <solver> [<x>...]
   pymoso -h | --help
   pymoso -v | --version
@@ -17,6 +17,10 @@ Options:
   --odir=D                  Set the output file directory name. [default: testrun]
   --crn                     Set if common random numbers are desired.
   --simpar=P                Set number of parallel processes for simulation replications. [default: 1]
+  --backend=K               Set how to take parallel replications, process, thread or serial. [default: process]
+  --invnorm=N               Set the inverse normal cdf, bsm or as241. [default: bsm]
+  --tree                    Set if seeds are laid out as a stream tree.
+  --simcache                Set if replications are cached in the output directory for reruns.
   --isp=T                   Set number of algorithm instances to solve. [default: 1]
   --proc=Q                  Set number of parallel processes for the algorithm instances. [default: 1]
   --metric                  Set if metric computation is desired.
@@ -31,7 +35,9 @@ Examples:
   pymoso solve --budget=100000 --odir=test1  ProbTPB RMINRLE 3 12
   pymoso solve --seed 12345 32123 5322 2 9543 666666666 ProbTPC RPERLE 31 21 11
   pymoso solve --simpar=4 --param betaeps 0.4 ProbTPA RPERLE 30 30
+  pymoso solve --simpar=4 --backend=thread ProbTPA RPERLE 30 30
   pymoso solve --param radius 3 ProbTPA RPERLE 45 45
+  pymoso solve --simcache --odir=tpa --budget=5000 ProbTPA RPERLE 45 45
   pymoso testsolve --isp=16 --proc=4 TPATester RPERLE
   pymoso testsolve --isp=20 --proc=10 --metric --crn TPBTester RMINRLE 9 9
 
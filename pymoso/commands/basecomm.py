@@ -74,7 +74,7 @@ def save_metadata(name, humantxt):
         dump(humantxt, f1, indent=4, separators=(',', ': '))
 
 
-def gen_humanfile(name, probn, solvn, budget, runtime, param, vals, startseed, endseed):
+def gen_humanfile(name, probn, solvn, budget, runtime, param, vals, startseed, endseed, invnorm='bsm', tree=False):
     """
     Generate a human-readable experiment metadata string
 
@@ -88,6 +88,10 @@ def gen_humanfile(name, probn, solvn, budget, runtime, param, vals, startseed, e
     vals : list
     startseed : tuple of int
     endseed : tuple of int
+    invnorm : str, optional
+        Inverse normal cdf of the oracle generators
+    tree : bool, optional
+        Indicates whether the seeds are laid out as a stream tree
 
     Returns
     -------
@@ -97,8 +101,8 @@ def gen_humanfile(name, probn, solvn, budget, runtime, param, vals, startseed, e
     today = date.today()
     tstr = today.strftime("%A %d. %B %Y")
     timestr = time.strftime('%X')
-    dnames = ('Name', 'Problem', 'Algorithm', 'Budget', 'Run time', 'Day', 'Time', 'Params', 'Param Values', 'start seed', 'end seed')
-    ddate = (name, probn, solvn, budget, runtime, tstr, timestr, param, vals, startseed, endseed)
+    dnames = ('Name', 'Problem', 'Algorithm', 'Budget', 'Run time', 'Day', 'Time', 'Params', 'Param Values', 'start seed', 'end seed', 'inverse normal', 'stream tree')
+    ddate = (name, probn, solvn, budget, runtime, tstr, timestr, param, vals, startseed, endseed, invnorm, tree)
     ddict = collections.OrderedDict(zip(dnames, ddate))
     return ddict
 
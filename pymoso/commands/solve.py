@@ -31,7 +31,14 @@ class Solve(BaseComm):
         name = self.options['--odir']
         hasseed = self.options['--seed']
         simpar = int(self.options['--simpar'])
+        backend = self.options['--backend']
         crn = self.options['--crn']
+        invnorm = self.options['--invnorm']
+        tree = self.options['--tree']
+        simcache = None
+        if self.options['--simcache']:
+            pathlib.Path(name).mkdir(exist_ok=True)
+            simcache = os.path.join(name, 'simcache.sqlite')
         if hasseed:
             seed = tuple(int(i) for i in self.options['<s>'])
         else:
@@ -108,7 +115,11 @@ class Solve(BaseComm):
         solve_kwargs['budget'] = budget
         solve_kwargs['seed'] = seed
         solve_kwargs['simpar'] = simpar
+        solve_kwargs['backend'] = backend
         solve_kwargs['crn'] = crn
+        solve_kwargs['invnorm'] = invnorm
+        solve_kwargs['tree'] = tree
+        solve_kwargs['simcache'] = simcache
         for i, p in enumerate(params):
             solve_kwargs[p] = float(vals[i])
         start_opt_time = time.time()
@@ -118,7 +129,7 @@ class Solve(BaseComm):
         res, end_seed = solve(probclass, solvclass, x0, **solve_kwargs)
         end_opt_time = time.time()
         opt_durr = end_opt_time - start_opt_time
-        humtxt = gen_humanfile(name, probarg, solvarg, budget, opt_durr, params, vals, seed, end_seed)
+        humtxt = gen_humanfile(name, probarg, solvarg, budget, opt_durr, params, vals, seed, end_seed, invnorm, tree)
         seed = tuple([int(i) for i in end_seed])
         print('-- Run time: {0:.2f} seconds'.format(opt_durr))
         endstr = '-- next seed:'
@@ -33,6 +33,12 @@ class TestSolve(BaseComm):
         isp = int(self.options['--isp'])
         proc = int(self.options['--proc'])
         crn = self.options['--crn']
+        invnorm = self.options['--invnorm']
+        tree = self.options['--tree']
+        simcache = None
+        if self.options['--simcache']:
+            pathlib.Path(name).mkdir(exist_ok=True)
+            simcache = os.path.join(name, 'simcache.sqlite')
         ## determine the solver and problem
         solvarg = self.options['<solver>']
         base_mod_name = solvarg
@@ -130,6 +136,9 @@ class TestSolve(BaseComm):
         solve_kwargs['proc'] = proc
         solve_kwargs['ranx0'] = ranx0
         solve_kwargs['crn'] = crn
+        solve_kwargs['invnorm'] = invnorm
+        solve_kwargs['tree'] = tree
+        solve_kwargs['simcache'] = simcache
         for i, p in enumerate(params):
             solve_kwargs[p] = float(vals[i])
         start_opt_time = time.time()
@@ -139,7 +148,7 @@ class TestSolve(BaseComm):
         res, end_seed = testsolve(testclass, solvclass, x0, **solve_kwargs)
         end_opt_time = time.time()
         opt_durr = end_opt_time - start_opt_time
-        humtxt = gen_humanfile(name, testarg, solvarg, budget, opt_durr, params, vals, seed, end_seed)
+        humtxt = gen_humanfile(name, testarg, solvarg, budget, opt_durr, params, vals, seed, end_seed, invnorm, tree)
         seed = tuple([int(i) for i in end_seed])
         print('-- Optimization run time: {0:.2f} seconds'.format(opt_durr))
         endstr = '-- ending seed:'
@@ -1 +1 @@
-from .mrg32k3a import MRG32k3a, get_next_prnstream, jump_substream
+from .mrg32k3a import MRG32k3a, get_next_prnstream, jump_substream, MultiStreamMRG32k3a, get_substreams, StreamTree
@@ -0,0 +1,475 @@
+#!/usr/bin/env python
+"""
+Summary
+-------
+Measure the throughput of the pseudo-random number generator layer and
+report it as JSON, to compare releases and catch regressions. Run it
+with `python -m pymoso.prng.benchmark`.
+
+Usage:
+  benchmark [--draws=N] [--jumps=J] [--errpoints=E] [--repeat=R] [--out=F]
+  benchmark -h | --help
+
+Options:
+  --draws=N                 Set the number of draws per timing. [default: 100000]
+  --jumps=J                 Set the number of jumps per timing. [default: 2000]
+  --errpoints=E             Set the number of probabilities per error region. [default: 500]
+  --repeat=R                Set the number of timings, the best is kept. [default: 5]
+  --out=F                   Write the JSON to file F instead of standard output.
+  -h --help                 Show this screen.
+
+Listing
+-------
+best_time
+rate
+bench_generate
+bench_random
+bench_normalvariate
+bench_bsm
+normal_cdf_reference
+normal_ppf_reference
+bench_inverse_normal
+bench_uniforms
+bench_crn
+bench_streams
+bench_memory
+run_benchmarks
+main
+"""
+import gc
+import json
+import pickle
+import platform
+import sys
+import time
+import tracemalloc
+from decimal import Decimal, localcontext
+from .mrg32k3a import MRG32k3a, mrg32k3a, bsm, invnorms, mrgnorm, get_next_prnstream, jump_substream, np
+from .. import __version__
+
+## digits of the reference inverse normal cdf and of pi for it
+refprec = 60
+refpi = Decimal('3.14159265358979323846264338327950288419716939937510582097494459')
+
+
+def best_time(func, repeat):
+    """
+    Time a function several times and return the fastest run.
+
+    Parameters
+    ----------
+    func : function
+        Takes no arguments
+    repeat : int
+
+    Returns
+    -------
+    float
+        Fastest run time in seconds
+    """
+    best = float('inf')
+    for r in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def rate(count, seconds, unit):
+    """
+    Format a throughput result.
+
+    Parameters
+    ----------
+    count : int
+    seconds : float
+    unit : str
+
+    Returns
+    -------
+    dict
+    """
+    return {'unit': unit, 'per_second': count/seconds, 'seconds': seconds, 'count': count}
+
+
+def bench_generate(n, repeat):
+    """
+    Measure the bare `mrg32k3a` function.
+
+    Parameters
+    ----------
+    n : int
+        Number of draws per timing
+    repeat : int
+
+    Returns
+    -------
+    dict
+    """
+    def run():
+        seed = (12345, 12345, 12345, 12345, 12345, 12345)
+        for i in range(n):
+            seed, u = mrg32k3a(seed)
+    return rate(n, best_time(run, repeat), 'draws')
+
+
+def bench_random(n, repeat):
+    """
+    Measure `MRG32k3a.random`.
+
+    Parameters
+    ----------
+    n : int
+        Number of draws per timing
+    repeat : int
+
+    Returns
+    -------
+    dict
+    """
+    rng = MRG32k3a()
+    def run():
+        random = rng.random
+        for i in range(n):
+            random()
+    return rate(n, best_time(run, repeat), 'draws')
+
+
+def bench_normalvariate(n, repeat):
+    """
+    Measure `MRG32k3a.normalvariate`.
+
+    Parameters
+    ----------
+    n : int
+        Number of draws per timing
+    repeat : int
+
+    Returns
+    -------
+    dict
+    """
+    rng = MRG32k3a()
+    def run():
+        normalvariate = rng.normalvariate
+        for i in range(n):
+            normalvariate()
+    return rate(n, best_time(run, repeat), 'draws')
+
+
+def bench_bsm(n, repeat):
+    """
+    Measure the Beasley-Springer-Moro inverse normal `bsm`.
+
+    Parameters
+    ----------
+    n : int
+        Number of inversions per timing
+    repeat : int
+
+    Returns
+    -------
+    dict
+    """
+    rng = MRG32k3a()
+    us = [rng.random() for i in range(n)]
+    def run():
+        for u in us:
+            bsm(u)
+    return rate(n, best_time(run, repeat), 'inversions')
+
+
+def normal_cdf_reference(z):
+    """
+    Compute the standard normal cdf from its Taylor series to `refprec`
+    digits.
+
+    Parameters
+    ----------
+    z : decimal.Decimal
+        Value of magnitude at most about 7
+
+    Returns
+    -------
+    decimal.Decimal
+    """
+    with localcontext() as ctx:
+        ctx.prec = refprec + 20
+        x = z/Decimal(2).sqrt()
+        x2 = x*x
+        term = x
+        total = x
+        n = 0
+        eps = Decimal(10)**(-refprec - 15)
+        while abs(term) > eps:
+            n += 1
+            term = -term*x2/n
+            total += term/(2*n + 1)
+        erf = 2*total/refpi.sqrt()
+        return (1 + erf)/2
+
+
+def normal_ppf_reference(u):
+    """
+    Compute the standard normal quantile of `u` to about `refprec`
+    digits by Newton's method on `normal_cdf_reference`.
+
+    Parameters
+    ----------
+    u : float
+        Probability that an mrg32k3a uniform can take
+
+    Returns
+    -------
+    decimal.Decimal
+    """
+    with localcontext() as ctx:
+        ctx.prec = refprec + 20
+        p = Decimal(u)
+        z = Decimal(invnorms['as241'][0](u))
+        sq2pi = (2*refpi).sqrt()
+        for i in range(4):
+            z -= (normal_cdf_reference(z) - p)*sq2pi/(-z*z/2).exp()
+        return z
+
+
+def bench_inverse_normal(n, repeat, errpoints=500):
+    """
+    Measure the speed of every inverse normal cdf in `invnorms`, and its
+    largest error against `normal_ppf_reference` in the center, the
+    shoulders and the tails of the uniforms mrg32k3a can return.
+
+    Parameters
+    ----------
+    n : int
+        Number of inversions per timing
+    repeat : int
+    errpoints : int
+        Number of probabilities in each error region
+
+    Returns
+    -------
+    dict
+        Keyed by backend name
+    """
+    rng = MRG32k3a()
+    us = [rng.random() for i in range(n)]
+    ## regions of u by distance from 1/2, half below and half above it
+    regions = {'center': (0.0, 0.42), 'shoulder': (0.42, 0.5 - 1e-6), 'tail': (0.5 - 1e-6, 0.5 - mrgnorm)}
+    errus = dict()
+    for reg, (lo, hi) in regions.items():
+        ys = [lo + (hi - lo)*rng.random() for i in range(errpoints)]
+        errus[reg] = [0.5 - y if i % 2 else 0.5 + y for i, y in enumerate(ys)]
+    errus['tail'] += [mrgnorm, 1 - mrgnorm]
+    refs = {reg: [normal_ppf_reference(u) for u in errus[reg]] for reg in errus}
+    res = dict()
+    for name, (scalar, vector) in invnorms.items():
+        def run():
+            for u in us:
+                scalar(u)
+        res[name] = {'scalar': rate(n, best_time(run, repeat), 'inversions')}
+        if np is not None:
+            ua = np.array(us)
+            out = np.empty(n)
+            res[name]['array'] = rate(n, best_time(lambda: vector(ua, out), repeat), 'inversions')
+        abserr = dict()
+        relerr = dict()
+        for reg in errus:
+            errs = [(abs(Decimal(scalar(u)) - ref), abs(ref)) for u, ref in zip(errus[reg], refs[reg])]
+            abserr[reg] = float(max(e for e, a in errs))
+            relerr[reg] = float(max(e/max(a, 1) for e, a in errs))
+        res[name]['max_abs_error'] = abserr
+        res[name]['max_rel_error'] = relerr
+    return res
+
+
+def bench_uniforms(n, repeat):
+    """
+    Measure the batched `MRG32k3a.uniforms` and `MRG32k3a.normals`.
+
+    Parameters
+    ----------
+    n : int
+        Number of draws per timing
+    repeat : int
+
+    Returns
+    -------
+    dict
+        Empty if NumPy is not installed
+    """
+    if np is None:
+        return dict()
+    rng = MRG32k3a()
+    out = np.empty(n)
+    res = dict()
+    res['uniforms'] = rate(n, best_time(lambda: rng.uniforms(n, out), repeat), 'draws')
+    res['normals'] = rate(n, best_time(lambda: rng.normals(n, out=out), repeat), 'draws')
+    return res
+
+
+def bench_crn(n, repeat, reps=10):
+    """
+    Measure normal draws under common random numbers, where `reps`
+    points each take the same `n // reps` draws from the start of a
+    stream, without a cache, with the cache, and with replay buffers.
+
+    Parameters
+    ----------
+    n : int
+        Number of draws per timing
+    repeat : int
+    reps : int
+        Number of points revisiting the same draws
+
+    Returns
+    -------
+    dict
+    """
+    per_point = max(1, n//reps)
+    res = dict()
+    for mode in ('uncached', 'cached', 'replay'):
+        def run():
+            rng = MRG32k3a()
+            rng.set_class_cache(mode == 'cached')
+            rng.set_replay(mode == 'replay')
+            start = rng.getstate()
+            normalvariate = rng.normalvariate
+            for p in range(reps):
+                rng.setstate(start)
+                for i in range(per_point):
+                    normalvariate()
+        res['crn_' + mode] = rate(reps*per_point, best_time(run, repeat), 'draws')
+    return res
+
+
+def bench_streams(m, repeat):
+    """
+    Measure `get_next_prnstream` and `jump_substream`.
+
+    Parameters
+    ----------
+    m : int
+        Number of jumps per timing
+    repeat : int
+
+    Returns
+    -------
+    dict
+    """
+    def run_streams():
+        rng = MRG32k3a()
+        for i in range(m):
+            rng = get_next_prnstream(rng.get_seed(), False)
+    def run_substreams():
+        rng = MRG32k3a()
+        for i in range(m):
+            jump_substream(rng)
+    res = dict()
+    res['get_next_prnstream'] = rate(m, best_time(run_streams, repeat), 'jumps')
+    res['jump_substream'] = rate(m, best_time(run_substreams, repeat), 'jumps')
+    return res
+
+
+def bench_memory(m=1000):
+    """
+    Measure the memory of a generator, of its state, and of a cached
+    draw.
+
+    Parameters
+    ----------
+    m : int
+        Number of generators or draws to average over
+
+    Returns
+    -------
+    dict
+        Sizes in bytes
+    """
+    res = dict()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    rngs = [MRG32k3a((12345, 12345, 12345, 12345, 12345, 12345 + i)) for i in range(m)]
+    for rng in rngs:
+        rng.random()
+    res['bytes_per_stream'] = (tracemalloc.get_traced_memory()[0] - base)/m
+    rng = rngs[0]
+    res['bytes_per_pickled_state'] = len(pickle.dumps(rng.getstate()))
+    del rngs
+    rng.set_class_cache(True)
+    base = tracemalloc.get_traced_memory()[0]
+    for i in range(m):
+        rng.normalvariate()
+    res['bytes_per_cached_draw'] = (tracemalloc.get_traced_memory()[0] - base)/m
+    rng.set_class_cache(False)
+    rng.set_replay(True)
+    base = tracemalloc.get_traced_memory()[0]
+    for i in range(m):
+        rng.normalvariate()
+    res['bytes_per_replayed_draw'] = (tracemalloc.get_traced_memory()[0] - base)/m
+    tracemalloc.stop()
+    return res
+
+
+def run_benchmarks(draws=100000, jumps=2000, repeat=5, errpoints=500):
+    """
+    Run all generator benchmarks.
+
+    Parameters
+    ----------
+    draws : int
+        Number of draws per timing
+    jumps : int
+        Number of stream jumps per timing
+    repeat : int
+        Number of timings of each benchmark, the fastest is kept
+    errpoints : int
+        Number of probabilities per region of the inverse normal errors
+
+    Returns
+    -------
+    dict
+        The environment and the results, ready for `json.dump`
+    """
+    results = dict()
+    results['mrg32k3a'] = bench_generate(draws, repeat)
+    results['random'] = bench_random(draws, repeat)
+    results['normalvariate'] = bench_normalvariate(draws, repeat)
+    results['bsm'] = bench_bsm(draws, repeat)
+    results['inverse_normal'] = bench_inverse_normal(draws, repeat, errpoints)
+    results.update(bench_uniforms(draws, repeat))
+    results.update(bench_crn(draws, repeat))
+    results.update(bench_streams(jumps, repeat))
+    results['memory'] = bench_memory()
+    return {
+        'pymoso': __version__,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'numpy': None if np is None else np.__version__,
+        'draws': draws,
+        'jumps': jumps,
+        'errpoints': errpoints,
+        'repeat': repeat,
+        'results': results,
+        }
+
+
+def main():
+    """
+    Run the benchmarks from the command line and print or save the JSON.
+    """
+    from docopt import docopt
+    options = docopt(__doc__)
+    res = run_benchmarks(int(options['--draws']), int(options['--jumps']), int(options['--repeat']), int(options['--errpoints']))
+    if options['--out']:
+        with open(options['--out'], 'w') as f1:
+            json.dump(res, f1, indent=4, separators=(',', ': '))
+    else:
+        json.dump(res, sys.stdout, indent=4, separators=(',', ': '))
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -8,13 +8,30 @@ with substream support.
 Listing
 -------
 MRG323k3a
+bsm
+as241
 get_next_prnstream
 jump_substream
+stream_at
+substream_at
+seed_at
+uniform_at
+advance_seed
+MultiStreamMRG32k3a
+get_substreams
+StreamTree
 """
 
 import random
-from math import log
+import sys
+from array import array
+from math import log, floor, sqrt, exp, lgamma
+from collections import namedtuple
 import functools
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 ## constants used in mrg32k3a and in substream generation
 ## all from:
@@ -53,12 +70,74 @@ mrga13n = 810728.0
 mrga21 = 527612.0
 mrga23n = 1370589.0
 
+## one step transition matrices of the two mrg32k3a components, i.e.
+ # A^(2^0), for exact integer jump-ahead
+a1p0 = [[0, 1, 0],
+    [0, 0, 1],
+    [4294967087 - 810728, 1403580, 0]
+]
+
+a2p0 = [[0, 1, 0],
+    [0, 0, 1],
+    [4294944443 - 1370589, 0, 527612]
+]
+
+## periods of the two components, A^period = I
+mrgper1 = 4294967087**3 - 1
+mrgper2 = 4294944443**3 - 1
+# jumps below 2^jumpbits skip the reduction by the periods so stream and
+ # substream offsets, e.g. i*2^127 + j*2^76 + k, stay sparse in bits
+jumpbits = 192
+
+## levels of a StreamTree below the experiment and the bits of the index
+ # of each, then the bits of the draws of a leaf. Offsets stay below
+ # 2^188, under the combined period of about 2^191, so distinct nodes never
+ # share a draw.
+treelevels = (('trial', 24), ('iteration', 24), ('replication', 40), ('chunk', 24))
+treedrawbits = 76
+
+## constants used to keep random.Random methods on the mrg32k3a stream
+# largest range `_randbelow` can draw from using a 53-bit float
+randmaxsize = 2**53
+# hashes are cast to size_t when random.Random is seeded with a tuple
+sizetmod = 2*(sys.maxsize + 1)
+# smallest block for which stepping numpy lanes beats the scalar recursion
+blockmin = 256
+
+## approximate bytes held per cached entry of mrg32k3a and of bsm,
+ # measured with tracemalloc on CPython 3.11
+genentrybytes = 340
+bsmentrybytes = 150
+## approximate bytes held by an empty replay buffer and its seed key
+replayentrybytes = 400
+
+## constants used for inverting the gamma and poisson cdfs
+# relative tolerance of the incomplete gamma series and continued fraction
+gameps = 2.220446049250313e-16
+# smallest magnitude allowed in the modified Lentz continued fraction
+gamfpmin = 1e-300
+# relative tolerance of the Halley iterations inverting the gamma cdf
+gaminveps = 1e-8
+# gamma quantiles below the smallest normal float are returned as 0
+gamtiny = 2.2250738585072014e-308
+# number of standard deviations past the mean kept in the poisson cdf table
+poisdevs = 10
+
 
 #constants used for approximating the inverse standard normal cdf
 ## Beasly-Springer-Moro
 bsma = [2.50662823884, -18.61500062529, 41.39119773534, -25.44106049637]
 bsmb = [-8.47351093090, 23.08336743743, -21.06224101826, 3.13082909833]
 bsmc = [0.3374754822726147, 0.9761690190917186, 0.1607979714918209, 0.0276438810333863, 0.0038405729373609,0.0003951896411919, 0.0000321767881768, 0.0000002888167364, 0.0000003960315187]
+## Wichura AS241 PPND16, coefficients in increasing powers
+ # M. J. Wichura, ``Algorithm AS 241: The Percentage Points of the Normal
+ # Distribution'', Applied Statistics, 37, 3 (1988), 477--484.
+as241a = [3.3871328727963666080e0, 1.3314166789178437745e+2, 1.9715909503065514427e+3, 1.3731693765509461125e+4, 4.5921953931549871457e+4, 6.7265770927008700853e+4, 3.3430575583588128105e+4, 2.5090809287301226727e+3]
+as241b = [1.0, 4.2313330701600911252e+1, 6.8718700749205790830e+2, 5.3941960214247511077e+3, 2.1213794301586595867e+4, 3.9307895800092710610e+4, 2.8729085735721942674e+4, 5.2264952788528545610e+3]
+as241c = [1.42343711074968357734e0, 4.63033784615654529590e0, 5.76949722146069140550e0, 3.64784832476320460504e0, 1.27045825245236838258e0, 2.41780725177450611770e-1, 2.27238449892691845833e-2, 7.74545014278341407640e-4]
+as241d = [1.0, 2.05319162663775882187e0, 1.67638483018380384940e0, 6.89767334985100004550e-1, 1.48103976427480074590e-1, 1.51986665636164571966e-2, 5.47593808499534494600e-4, 1.05075007164441684324e-9]
+as241e = [6.65790464350110377720e0, 5.46378491116411436990e0, 1.78482653991729133580e0, 2.96560571828504891230e-1, 2.65321895265761230930e-2, 1.24266094738807843860e-3, 2.71155556874348757815e-5, 2.01033439929228813265e-7]
+as241f = [1.0, 5.99832206555887937690e-1, 1.36929880922735805310e-1, 1.48753612908506148525e-2, 7.86869131145613259100e-4, 1.84631831751005468180e-5, 1.42151175831644588870e-7, 2.04426310338993978564e-15]
 
 
 # this is adapted to pure Python from the P. L'Ecuyer code referenced above
@@ -94,6 +173,39 @@ def mrg32k3a(seed):
     return newseed, u
 
 
+def mrg32k3a_array(seed):
+    """
+    Generate one random number between 0 and 1 from each of many seeds.
+
+    Parameters
+    ----------
+    seed : tuple of numpy.ndarray of int64
+        Length must be 6, component i holds component i of every seed.
+
+    Returns
+    -------
+    newseed : tuple of numpy.ndarray of int64
+    u : numpy.ndarray of float64
+
+    Notes
+    -----
+    Every product is less than 2^53, so int64 arithmetic is exact and
+    each element is identical to `mrg32k3a` of the same seed.
+    """
+    x0, x1, x2, y0, y1, y2 = seed
+    p1 = int(mrga12)*x1
+    p1 -= int(mrga13n)*x0
+    p1 %= int(mrgm1)
+    p2 = int(mrga21)*y2
+    p2 -= int(mrga23n)*y0
+    p2 %= int(mrgm2)
+    d = p1 - p2
+    d[d <= 0] += int(mrgm1)
+    u = d*mrgnorm
+    newseed = (x1, x2, p1, y1, y2, p2)
+    return newseed, u
+
+
 # as in beasly-springer-moro
 def bsm(u):
     """
@@ -140,6 +252,327 @@ def bsm(u):
     return z
 
 
+def bsm_array(u, out=None):
+    """
+    Approximate the quantiles of the standard normal distribution for an
+    array of probabilities, as `bsm` does for each element.
+
+    Parameters
+    ----------
+    u : numpy.ndarray of float64
+        Desired quantiles between 0 and 1
+    out : numpy.ndarray of float64, optional
+        Array of the same shape as `u` in which to store the quantiles.
+        May be `u` itself.
+
+    Returns
+    -------
+    out : numpy.ndarray of float64
+
+    Notes
+    -----
+    The polynomials are evaluated in Horner form, so a quantile z may
+    differ from that of `bsm` by rounding, at most 5e-15*max(1, abs(z))
+    for every u in (0, 1). Each variate still inverts exactly one
+    uniform, so streams stay synchronized for common random numbers.
+    """
+    if np is None:
+        raise ImportError('bsm_array requires NumPy.')
+    u = np.asarray(u, dtype=np.float64)
+    if out is None:
+        out = np.empty_like(u)
+    y = u - 0.5
+    ## approximate from the center (Beasly Springer 1973)
+    center = np.abs(y) < 0.42
+    yc = y[center]
+    r = yc*yc
+    asum = ((bsma[3]*r + bsma[2])*r + bsma[1])*r + bsma[0]
+    bsum = (((bsmb[3]*r + bsmb[2])*r + bsmb[1])*r + bsmb[0])*r + 1
+    ## approximate from the tails (Moro 1995)
+    tails = ~center
+    yt = y[tails]
+    ut = u[tails]
+    s = np.log(-np.log(np.where(yt < 0.0, ut, 1 - ut)))
+    t = bsmc[8]
+    for c in reversed(bsmc[:8]):
+        t = t*s + c
+    out[center] = yc*(asum/bsum)
+    out[tails] = np.where(yt < 0.0, -t, t)
+    return out
+
+
+def as241(u):
+    """
+    Approximate the quantiles of the standard normal distribution to
+    about 1e-16 relative error with Wichura's AS241.
+
+    Parameters
+    ----------
+    u : float
+        Desired quantile between 0 and 1
+
+    Returns
+    -------
+    z : float
+    """
+    a = as241a
+    b = as241b
+    y = u - 0.5
+    if abs(y) <= 0.425:
+        r = 0.180625 - y*y
+        num = ((((((a[7]*r + a[6])*r + a[5])*r + a[4])*r + a[3])*r + a[2])*r + a[1])*r + a[0]
+        den = ((((((b[7]*r + b[6])*r + b[5])*r + b[4])*r + b[3])*r + b[2])*r + b[1])*r + 1.0
+        return y*num/den
+    r = sqrt(-log(u if y < 0.0 else 1 - u))
+    if r <= 5.0:
+        r -= 1.6
+        c = as241c
+        d = as241d
+    else:
+        r -= 5.0
+        c = as241e
+        d = as241f
+    num = ((((((c[7]*r + c[6])*r + c[5])*r + c[4])*r + c[3])*r + c[2])*r + c[1])*r + c[0]
+    den = ((((((d[7]*r + d[6])*r + d[5])*r + d[4])*r + d[3])*r + d[2])*r + d[1])*r + 1.0
+    z = num/den
+    return -z if y < 0.0 else z
+
+
+def as241_array(u, out=None):
+    """
+    Approximate the quantiles of the standard normal distribution for an
+    array of probabilities, as `as241` does for each element.
+
+    Parameters
+    ----------
+    u : numpy.ndarray of float64
+        Desired quantiles between 0 and 1
+    out : numpy.ndarray of float64, optional
+        Array of the same shape as `u` in which to store the quantiles.
+        May be `u` itself.
+
+    Returns
+    -------
+    out : numpy.ndarray of float64
+
+    Notes
+    -----
+    The tails take math.log of each element, since numpy.log may differ
+    from it in the last bit, so every quantile is identical to `as241`.
+    """
+    if np is None:
+        raise ImportError('as241_array requires NumPy.')
+    u = np.asarray(u, dtype=np.float64)
+    if out is None:
+        out = np.empty_like(u)
+    y = u - 0.5
+    center = np.abs(y) <= 0.425
+    yc = y[center]
+    r = 0.180625 - yc*yc
+    num = as241a[7]
+    den = as241b[7]
+    for k in range(6, -1, -1):
+        num = num*r + as241a[k]
+        den = den*r + as241b[k]
+    zc = yc*num/den
+    tails = ~center
+    yt = y[tails]
+    ut = u[tails]
+    pt = np.where(yt < 0.0, ut, 1 - ut)
+    r = np.sqrt(-np.fromiter(map(log, pt.tolist()), dtype=np.float64, count=len(pt)))
+    near = r <= 5.0
+    r = np.where(near, r - 1.6, r - 5.0)
+    num = np.where(near, as241c[7], as241e[7])
+    den = np.where(near, as241d[7], as241f[7])
+    for k in range(6, -1, -1):
+        num = num*r + np.where(near, as241c[k], as241e[k])
+        den = den*r + np.where(near, as241d[k], as241f[k])
+    zt = num/den
+    out[center] = zc
+    out[tails] = np.where(yt < 0.0, -zt, zt)
+    return out
+
+
+## inverse standard normal cdf backends of MRG32k3a, scalar and array
+invnorms = {'bsm': (bsm, bsm_array), 'as241': (as241, as241_array)}
+
+
+def gammainc_array(a, x):
+    """
+    Compute the regularized lower incomplete gamma function P(a, x) for
+    an array of x.
+
+    Parameters
+    ----------
+    a : float
+        Positive shape parameter
+    x : numpy.ndarray of float64
+        Non-negative values
+
+    Returns
+    -------
+    res : numpy.ndarray of float64
+
+    Notes
+    -----
+    Uses the series for x < a + 1 and the continued fraction otherwise,
+    as in W. H. Press et al. Numerical Recipes, 3rd ed. (2007), 6.2.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    res = np.empty_like(x)
+    gln = lgamma(a)
+    maxit = int(10*sqrt(a)) + 100
+    lo = x < a + 1
+    hi = ~lo
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ## the series
+        xs = x[lo]
+        ap = a
+        term = np.full(xs.shape, 1/a)
+        tot = term.copy()
+        for i in range(maxit):
+            ap += 1
+            term *= xs/ap
+            tot += term
+            if np.all(np.abs(term) < np.abs(tot)*gameps):
+                break
+        res[lo] = tot*np.exp(-xs + a*np.log(xs) - gln)
+        ## the continued fraction by the modified Lentz method
+        xc = x[hi]
+        b = xc + 1 - a
+        c = np.full(xc.shape, 1/gamfpmin)
+        d = 1/b
+        h = d.copy()
+        for i in range(1, maxit):
+            an = -i*(i - a)
+            b += 2
+            d = an*d + b
+            d[np.abs(d) < gamfpmin] = gamfpmin
+            c = b + an/c
+            c[np.abs(c) < gamfpmin] = gamfpmin
+            d = 1/d
+            delta = d*c
+            h *= delta
+            if np.all(np.abs(delta - 1) <= gameps):
+                break
+        res[hi] = 1 - np.exp(-xc + a*np.log(xc) - gln)*h
+    return res
+
+
+def gammaincinv_array(a, p):
+    """
+    Invert the regularized lower incomplete gamma function, i.e.
+    approximate the quantiles of the gamma distribution with shape `a`
+    and scale 1, for an array of probabilities.
+
+    Parameters
+    ----------
+    a : float
+        Positive shape parameter
+    p : numpy.ndarray of float64
+        Desired quantiles between 0 and 1
+
+    Returns
+    -------
+    x : numpy.ndarray of float64
+
+    Notes
+    -----
+    Halley iterations from the initial guesses of W. H. Press et al.
+    Numerical Recipes, 3rd ed. (2007), 6.2.1, stopped when the relative
+    step is below 1e-8. Quantiles that underflow are 0.
+    """
+    p = np.asarray(p, dtype=np.float64)
+    gln = lgamma(a)
+    a1 = a - 1
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        if a > 1:
+            lna1 = log(a1)
+            afac = exp(a1*(lna1 - 1) - gln)
+            pp = np.where(p < 0.5, p, 1 - p)
+            t = np.sqrt(-2*np.log(pp))
+            x = (2.30753 + t*0.27061)/(1 + t*(0.99229 + t*0.04481)) - t
+            x = np.where(p < 0.5, -x, x)
+            x = np.maximum(1e-3, a*np.power(1 - 1/(9*a) - x/(3*sqrt(a)), 3))
+        else:
+            t = 1 - a*(0.253 + a*0.12)
+            x = np.where(p < t, np.power(p/t, 1/a), 1 - np.log(1 - (p - t)/(1 - t)))
+        x[p <= 0] = 0
+        x[p >= 1] = max(100, a + 100*sqrt(a))
+        # for small shapes, quantiles below the normal floats are 0
+        x[x < gamtiny] = 0
+        active = np.flatnonzero((p > 0) & (p < 1) & (x > 0))
+        for j in range(12):
+            if not active.size:
+                break
+            xa = x[active]
+            err = gammainc_array(a, xa) - p[active]
+            if a > 1:
+                t = afac*np.exp(-(xa - a1) + a1*(np.log(xa) - lna1))
+            else:
+                t = np.exp(-xa + a1*np.log(xa) - gln)
+            u = err/t
+            t = u/(1 - 0.5*np.minimum(1, u*(a1/xa - 1)))
+            xa = xa - t
+            xa = np.where(xa <= 0, 0.5*(xa + t), xa)
+            xa[xa < gamtiny] = 0
+            x[active] = xa
+            active = active[(np.abs(t) >= gaminveps*xa) & (xa > 0)]
+    return x
+
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+def retain_cache(func, maxsize):
+    """
+    Wrap a function of one hashable argument in a cache that keeps the
+    first `maxsize` results and only computes the rest.
+
+    Parameters
+    ----------
+    func : function
+    maxsize : int
+
+    Returns
+    -------
+    wrapper : function
+        Has `cache_info` and `cache_clear` like functools.lru_cache
+
+    Notes
+    -----
+    With common random numbers, every point revisits the same seeds in
+    the same order. Once such a cycle outgrows an LRU cache, every call
+    misses, while retaining the first entries still hits on them.
+    """
+    cache = {}
+    counts = [0, 0]
+
+    def wrapper(arg):
+        try:
+            res = cache[arg]
+        except KeyError:
+            counts[1] += 1
+            res = func(arg)
+            if len(cache) < maxsize:
+                cache[arg] = res
+            return res
+        counts[0] += 1
+        return res
+
+    def cache_info():
+        return CacheInfo(counts[0], counts[1], maxsize, len(cache))
+
+    def cache_clear():
+        cache.clear()
+        counts[0] = 0
+        counts[1] = 0
+
+    wrapper.cache_info = cache_info
+    wrapper.cache_clear = cache_clear
+    return wrapper
+
+
 class MRG32k3a(random.Random):
     """
     Implements mrg32k3a as the generator for a random.Random object
@@ -148,6 +581,26 @@ class MRG32k3a(random.Random):
     ----------
     _current_seed : tuple of int
         6 integer mrg32k3a seed
+    cache_maxsize : int or None
+        Most entries each cache holds when caching is on. Default is
+        None, i.e. limited only by `cache_maxbytes`.
+    cache_maxbytes : int or None
+        Approximate most bytes each cache holds. Default is 256 MiB.
+    cache_policy : str
+        'lru' evicts the least recently used entry, 'retain' keeps the
+        first entries. Default is 'lru'.
+    cache_totals : dict
+        Hits, misses and evictions of caches already cleared, not
+        counting the entries cleared
+    inverse_normal : str
+        Name of the inverse standard normal cdf in `invnorms` used by
+        `normalvariate` and `normals`. Default is 'bsm'.
+    replay_flag : bool
+        Indicates whether uniforms are recorded and replayed. Defaults
+        to off.
+    replay_maxbytes : int
+        Approximate most bytes the replay buffers hold when replay is
+        on. Default is 64 MiB.
 
     Parameters
     ----------
@@ -159,34 +612,255 @@ class MRG32k3a(random.Random):
     random.Random
     """
 
+    cache_maxsize = None
+    cache_maxbytes = 2**28
+    cache_policy = 'lru'
+    inverse_normal = 'bsm'
+    replay_flag = False
+    replay_maxbytes = 2**26
+
     def __init__(self, x=None):
         if not x:
             x = (12345, 12345, 12345, 12345, 12345, 12345)
         assert(len(x) == 6)
         self.version = 2
         self.generate = mrg32k3a
-        self.bsm = bsm
+        self.bsm = invnorms[self.inverse_normal][0]
+        self._replay = None
+        self._rbuf = None
         super().__init__(x)
 
-    def set_class_cache(self, cache_flag):
+    def set_class_cache(self, cache_flag, maxsize=None, maxbytes=None, policy=None):
         """
-        Sets whether to use an LRU cache for both the random function and the
-        bsm function.
+        Sets whether to use a bounded cache for both the random function
+        and the inverse normal cdf.
 
         Parameters
         ----------
         cache_flag : bool
+        maxsize : int, optional
+            Most entries per cache. Default is `cache_maxsize`.
+        maxbytes : int, optional
+            Approximate most bytes per cache. Default is `cache_maxbytes`.
+        policy : str, optional
+            'lru' or 'retain'. Default is `cache_policy`.
 
         See also
         --------
         functools.lru_cache
+        retain_cache
         """
+        if maxsize is not None:
+            self.cache_maxsize = maxsize
+        if maxbytes is not None:
+            self.cache_maxbytes = maxbytes
+        if policy is not None:
+            self.cache_policy = policy
+        self.cache_totals = {'generate': [0, 0, 0], 'bsm': [0, 0, 0]}
+        invnorm = invnorms[self.inverse_normal][0]
         if not cache_flag:
             self.generate = mrg32k3a
-            self.bsm = bsm
+            self.bsm = invnorm
+        else:
+            gensize = self.cache_maxsize
+            bsmsize = self.cache_maxsize
+            if self.cache_maxbytes is not None:
+                genlim = self.cache_maxbytes//genentrybytes
+                bsmlim = self.cache_maxbytes//bsmentrybytes
+                gensize = genlim if gensize is None else min(gensize, genlim)
+                bsmsize = bsmlim if bsmsize is None else min(bsmsize, bsmlim)
+            if self.cache_policy == 'lru':
+                self.generate = functools.lru_cache(maxsize=gensize)(mrg32k3a)
+                self.bsm = functools.lru_cache(maxsize=bsmsize)(invnorm)
+            elif self.cache_policy == 'retain':
+                self.generate = retain_cache(mrg32k3a, gensize)
+                self.bsm = retain_cache(invnorm, bsmsize)
+            else:
+                raise ValueError('cache policy must be lru or retain')
+
+    def set_inverse_normal(self, name):
+        """
+        Set the inverse standard normal cdf used by `normalvariate` and
+        `normals`, keeping the cache on if it is on.
+
+        Parameters
+        ----------
+        name : str
+            'bsm' (default) for Beasley-Springer-Moro, or 'as241' for
+            Wichura's AS241, which is accurate to about 1e-16
+
+        Notes
+        -----
+        Both invert one uniform per variate, so either works with common
+        random numbers. Results of runs with 'bsm' are reproduced only
+        with 'bsm'. Switching the cache on or off empties it.
+        """
+        if name not in invnorms:
+            raise ValueError('inverse normal must be one of ' + ', '.join(invnorms))
+        self.inverse_normal = name
+        if hasattr(self.bsm, 'cache_info'):
+            self.set_class_cache(True)
         else:
-            self.generate = functools.lru_cache(maxsize=None)(mrg32k3a)
-            self.bsm = functools.lru_cache(maxsize=None)(bsm)
+            self.bsm = invnorms[name][0]
+
+    def cache_info(self):
+        """
+        Report the use of the random and bsm caches since caching was
+        set, including caches cleared by `cache_clear`.
+
+        Returns
+        -------
+        info : dict
+            Keys are 'generate' and 'bsm'. Each value is a dict with keys
+            'hits', 'misses', 'evictions', 'currsize', 'maxsize', and
+            'bytes', the approximate size of the current entries.
+
+        Notes
+        -----
+        'evictions' counts only the entries an 'lru' cache dropped to
+        make room for new ones. A 'retain' cache never evicts, so misses
+        it does not store are not counted, and neither are the entries
+        emptied by `cache_clear`. Since `cache_clear`, the 'currsize' of
+        an 'lru' cache is its misses less its evictions.
+        """
+        info = dict()
+        for name, func, entrybytes in (('generate', self.generate, genentrybytes), ('bsm', self.bsm, bsmentrybytes)):
+            hits, misses, evictions = getattr(self, 'cache_totals', {}).get(name, (0, 0, 0))
+            maxsize = 0
+            currsize = 0
+            if hasattr(func, 'cache_info'):
+                ci = func.cache_info()
+                hits += ci.hits
+                misses += ci.misses
+                if self.cache_policy == 'lru' and ci.maxsize:
+                    # every miss adds an entry, so those gone were evicted
+                    evictions += ci.misses - ci.currsize
+                maxsize = ci.maxsize
+                currsize = ci.currsize
+            info[name] = {'hits': hits, 'misses': misses, 'evictions': evictions,
+                'currsize': currsize, 'maxsize': maxsize, 'bytes': currsize*entrybytes}
+        return info
+
+    def cache_clear(self):
+        """
+        Empty the random and bsm caches, keeping their hits, misses and
+        evictions in `cache_totals`.
+        """
+        info = self.cache_info()
+        self.cache_totals = {name: [info[name]['hits'], info[name]['misses'], info[name]['evictions']] for name in info}
+        for func in (self.generate, self.bsm):
+            if hasattr(func, 'cache_clear'):
+                func.cache_clear()
+
+    def set_replay(self, replay_flag, maxbytes=None):
+        """
+        Sets whether to record the uniforms drawn after each seed in a
+        replay buffer, and replay them when the generator is seeded there
+        again.
+
+        Parameters
+        ----------
+        replay_flag : bool
+        maxbytes : int, optional
+            Approximate most bytes of all buffers. Default is
+            `replay_maxbytes`.
+
+        Notes
+        -----
+        With common random numbers, `Oracle.crn_nextobs` seeds the
+        generator at the start of each substream, so every point after
+        the first replays the uniforms of the same replication by index.
+        Buffers stop growing at `maxbytes`, after which the uniforms are
+        generated again, and give the same values either way.
+        """
+        if maxbytes is not None:
+            self.replay_maxbytes = maxbytes
+        seed = self.get_seed()
+        self._rbuf = None
+        self.replay_flag = bool(replay_flag)
+        if not replay_flag:
+            self._replay = None
+            return
+        self._replay = dict()
+        self._replay_bytes = 0
+        self.replay_totals = [0, 0]
+        self._replay_attach(seed)
+
+    def replay_info(self):
+        """
+        Report the use of the replay buffers.
+
+        Returns
+        -------
+        info : dict
+            Keys are 'buffers', 'values', 'bytes', 'maxbytes', 'replayed',
+            and 'generated', the last two counting uniforms taken from the
+            buffers and computed while replay is on.
+        """
+        if not self.replay_flag:
+            return {'buffers': 0, 'values': 0, 'bytes': 0, 'maxbytes': self.replay_maxbytes, 'replayed': 0, 'generated': 0}
+        return {'buffers': len(self._replay), 'values': sum(len(buf) for buf in self._replay.values()),
+            'bytes': self._replay_bytes, 'maxbytes': self.replay_maxbytes,
+            'replayed': self.replay_totals[0], 'generated': self.replay_totals[1]}
+
+    def replay_clear(self):
+        """
+        Empty the replay buffers, keeping their counts.
+        """
+        if self.replay_flag:
+            seed = self.get_seed()
+            self._replay = dict()
+            self._replay_bytes = 0
+            self._replay_attach(seed)
+
+    def _replay_attach(self, a):
+        """
+        Make the buffer of seed `a` current, creating it if the memory
+        cap allows.
+
+        Parameters
+        ----------
+        a : tuple of int
+        """
+        buf = self._replay.get(a)
+        if buf is None and self._replay_bytes + replayentrybytes <= self.replay_maxbytes:
+            buf = array('d')
+            self._replay[a] = buf
+            self._replay_bytes += replayentrybytes
+        self._rbuf = buf
+        self._rstart = a
+        self._rpos = 0
+
+    def _replay_random(self, buf):
+        """
+        Return the next uniform of the current buffer, generating and
+        recording it if the buffer ends.
+
+        Parameters
+        ----------
+        buf : array.array of float
+
+        Returns
+        -------
+        u : float
+        """
+        pos = self._rpos
+        self.gauss_next = None
+        self._mt_synced = False
+        if pos < len(buf):
+            self.replay_totals[0] += 1
+            # the mrg32k3a seed is recovered in `get_seed` if needed
+            self._current_seed = None
+            self._rpos = pos + 1
+            return buf[pos]
+        self.replay_totals[1] += 1
+        newseed, u = self.generate(self.get_seed())
+        self._current_seed = newseed
+        self._rpos = pos + 1
+        if pos == len(buf) and self._replay_bytes + 8 <= self.replay_maxbytes:
+            buf.append(u)
+            self._replay_bytes += 8
+        return u
 
     def seed(self, a):
         """
@@ -195,10 +869,30 @@ class MRG32k3a(random.Random):
         Parameters
         ----------
         a : tuple of int
+
+        Notes
+        -----
+        Only the mrg32k3a seed is stored. The inherited Mersenne Twister
+        is reseeded lazily, and only if `getrandbits` or `getstate` need it.
         """
         assert(len(a) == 6)
         self._current_seed = a
-        super().seed(a)
+        self.gauss_next = None
+        self._mt_synced = False
+        if self._replay is not None:
+            self._replay_attach(a)
+
+    def _sync_mt(self):
+        """
+        Seed the inherited Mersenne Twister from the current mrg32k3a seed
+        exactly as random.Random.seed would have, preserving `gauss_next`.
+        """
+        if not self._mt_synced:
+            gauss_next = self.gauss_next
+            super().seed(hash(self.get_seed()) % sizetmod)
+            self.gauss_next = gauss_next
+            self._mt_synced = True
+            self._mt_used = False
 
     def random(self):
         """
@@ -209,11 +903,60 @@ class MRG32k3a(random.Random):
         -------
         u : float
         """
-        seed = self._current_seed
-        newseed, u = self.generate(seed)
-        self.seed(newseed)
+        buf = self._rbuf
+        if buf is not None:
+            return self._replay_random(buf)
+        newseed, u = self.generate(self._current_seed)
+        self._current_seed = newseed
+        self.gauss_next = None
+        self._mt_synced = False
         return u
 
+    def _randbelow(self, n):
+        """
+        Generate a random int in [0, n) using only `random`, so that the
+        inherited integer methods (e.g. randrange, choice, shuffle) draw
+        from the mrg32k3a stream.
+
+        Parameters
+        ----------
+        n : int
+
+        Returns
+        -------
+        int
+        """
+        random = self.random
+        if n >= randmaxsize:
+            return floor(random()*n)
+        rem = randmaxsize % n
+        limit = (randmaxsize - rem)/randmaxsize
+        r = random()
+        while r >= limit:
+            r = random()
+        return floor(r*randmaxsize) % n
+
+    def getrandbits(self, k):
+        """
+        Generate an int with `k` random bits from the Mersenne Twister
+        seeded by the current mrg32k3a seed.
+
+        Parameters
+        ----------
+        k : int
+
+        Returns
+        -------
+        int
+
+        See also
+        --------
+        random.Random
+        """
+        self._sync_mt()
+        self._mt_used = True
+        return super().getrandbits(k)
+
     def get_seed(self):
         """
         Return the current mrg32k3a seed.
@@ -223,24 +966,40 @@ class MRG32k3a(random.Random):
         tuple of int
             The current mrg32k3a seed
         """
-        return self._current_seed
+        seed = self._current_seed
+        if seed is None:
+            # replaying, so jump from the start of the buffer
+            seed = advance_seed(self._rstart, self._rpos)
+            self._current_seed = seed
+        return seed
 
     def getstate(self):
         """
-        Return the state of the generator.
+        Return the state of the generator, which also pickles it.
 
         Returns
         -------
         tuple of int
             The current seed
-        tuple
-            Random.getstate output
+        float or None
+            The cached `gauss` variate
+        tuple, optional
+            Random.getstate output, only if `getrandbits` has drawn from
+            the Mersenne Twister since it was seeded
 
         See also
         --------
         random.Random
+
+        Notes
+        -----
+        Otherwise the Mersenne Twister is a function of the seed, and
+        `setstate` leaves it to be reseeded lazily.
         """
-        return self.get_seed(), super().getstate()
+        seed = self.get_seed()
+        if self._mt_synced and self._mt_used:
+            return seed, self.gauss_next, super().getstate()
+        return seed, self.gauss_next
 
     def setstate(self, state):
         """
@@ -249,14 +1008,59 @@ class MRG32k3a(random.Random):
         Parameters
         ----------
         state : tuple
-            tuple[0] is mrg32k3a seed, [1] is random.Random.getstate
+            tuple[0] is mrg32k3a seed, [1] is the cached `gauss` variate
+            and the optional [2] is random.Random.getstate. States where
+            [1] is random.Random.getstate are also accepted.
 
         See also
         --------
         random.Random
         """
         self.seed(state[0])
-        super().setstate(state[1])
+        mtstate = state[2] if len(state) == 3 else state[1]
+        if isinstance(mtstate, tuple):
+            super().setstate(mtstate)
+            self._mt_synced = True
+            self._mt_used = True
+        if len(state) == 3 or not isinstance(state[1], tuple):
+            self.gauss_next = state[1]
+
+    def __reduce__(self):
+        """
+        Pickle the generator as its state and inverse normal cdf.
+        """
+        return self.__class__, (), (self.getstate(), self.inverse_normal)
+
+    def __setstate__(self, state):
+        """
+        Restore a pickled generator, including those pickled as a state
+        only.
+
+        Parameters
+        ----------
+        state : tuple
+        """
+        if len(state) == 2 and isinstance(state[1], str):
+            self.setstate(state[0])
+            self.set_inverse_normal(state[1])
+        else:
+            self.setstate(state)
+
+    def advance(self, n):
+        """
+        Jump the generator exactly `n` steps ahead in O(log n) time.
+
+        Parameters
+        ----------
+        n : int
+            Number of steps, e.g. 2^76 for a substream or 2^127 for a
+            stream. Negative steps move back.
+
+        See also
+        --------
+        advance_seed
+        """
+        self.seed(advance_seed(self.get_seed(), n))
 
     def normalvariate(self, mu=0, sigma=1):
         """
@@ -281,53 +1085,952 @@ class MRG32k3a(random.Random):
         z = self.bsm(u)
         return sigma*z + mu
 
+    def normals(self, n, mu=0, sigma=1, out=None):
+        """
+        Generate the next `n` normal variates of the stream as a block by
+        inverting `n` uniforms, advancing the generator state as `n` calls
+        to `normalvariate` would.
 
-def mat333mult(a, b):
-    """
-    Multiply a 3x3 matrix with a 3x1 matrix.
+        Parameters
+        ----------
+        n : int
+            Number of variates to generate
+        mu : float
+            Expected value of the normal distribution from which to
+            generate. Default is 0.
+        sigma : float
+            Standard deviation of the normal distribution from which to
+            generate. Default is 1.
+        out : numpy.ndarray of float64, optional
+            Array of length `n` in which to store the variates
 
-    Parameters
-    ----------
-    a : tuple of tuple of float
-        3x3 matrix
-    b : tuple of tuple if float
-        3x1 matrix
+        Returns
+        -------
+        out : numpy.ndarray of float64
 
-    Returns
-    -------
-    res : list of float
-        3x1 matrix
-    """
-    res = [0, 0, 0]
-    r3 = range(3)
-    for i in r3:
-        res[i] = sum([a[i][j]*b[j] for j in r3])
-    return res
+        See also
+        --------
+        bsm_array
+        as241_array
+        """
+        out = self.uniforms(n, out)
+        invnorms[self.inverse_normal][1](out, out)
+        out *= sigma
+        out += mu
+        return out
 
+    def exponentials(self, n, lambd=1.0, out=None):
+        """
+        Generate the next `n` exponential variates of the stream as a
+        block, inverting one uniform each as `expovariate` does.
 
-def mat311mod(a, b):
-    """
-    Compute moduli of a 3x1 matrix.
+        Parameters
+        ----------
+        n : int
+            Number of variates to generate
+        lambd : float
+            Rate of the exponential distribution. Default is 1.
+        out : numpy.ndarray of float64, optional
+            Array of length `n` in which to store the variates
 
-    Parameters
-    ----------
-    a : tuple of float
-        3x1 matrix
-    b : float
-        modulus
+        Returns
+        -------
+        out : numpy.ndarray of float64
+            The variates, equal to `n` calls to `expovariate` up to the
+            rounding of the logarithm
 
-    Returns
-    -------
-    res : tuple of float
-        3x1 matrix
-    """
-    res = [0, 0, 0]
+        See also
+        --------
+        random.Random.expovariate
+        """
+        out = self.uniforms(n, out)
+        np.subtract(1.0, out, out=out)
+        np.log(out, out=out)
+        np.negative(out, out=out)
+        out /= lambd
+        return out
+
+    def gammas(self, n, alpha, beta=1.0, out=None):
+        """
+        Generate the next `n` gamma variates of the stream as a block by
+        numerically inverting the gamma cdf at one uniform each.
+
+        Parameters
+        ----------
+        n : int
+            Number of variates to generate
+        alpha : float
+            Positive shape parameter
+        beta : float
+            Positive scale parameter. Default is 1.
+        out : numpy.ndarray of float64, optional
+            Array of length `n` in which to store the variates
+
+        Returns
+        -------
+        out : numpy.ndarray of float64
+
+        Notes
+        -----
+        Unlike `gammavariate`, which uses rejection, every variate consumes
+        exactly one uniform, so the variates pair across points under
+        common random numbers. They are not the `gammavariate` stream.
+
+        See also
+        --------
+        gammaincinv_array
+        """
+        if alpha <= 0 or beta <= 0:
+            raise ValueError('gammas: alpha and beta must be > 0.0')
+        out = self.uniforms(n, out)
+        out[:] = gammaincinv_array(alpha, out)
+        out *= beta
+        return out
+
+    def poissons(self, n, lambd, out=None):
+        """
+        Generate the next `n` Poisson variates of the stream as a block by
+        inverting the Poisson cdf at one uniform each.
+
+        Parameters
+        ----------
+        n : int
+            Number of variates to generate
+        lambd : float
+            Non-negative mean of the Poisson distribution
+        out : numpy.ndarray of int64, optional
+            Array of length `n` in which to store the variates
+
+        Returns
+        -------
+        out : numpy.ndarray of int64
+
+        Notes
+        -----
+        The cdf is tabulated within `poisdevs` standard deviations of the
+        mean, where the omitted probability is below 1e-20.
+        """
+        if lambd < 0:
+            raise ValueError('poissons: lambd must be >= 0.0')
+        if out is None:
+            out = np.empty(n, dtype=np.int64)
+        elif out.shape != (n, ):
+            raise ValueError('out must be a 1-d array of length n.')
+        u = self.uniforms(n)
+        if lambd == 0:
+            out[:] = 0
+            return out
+        dev = poisdevs*sqrt(lambd) + 2*poisdevs
+        kmin = max(0, int(lambd - dev))
+        kmax = int(lambd + dev) + 1
+        k = np.arange(kmin, kmax + 1)
+        logfact = lgamma(kmin + 1) + np.concatenate(([0.0], np.cumsum(np.log(k[1:]))))
+        cdf = np.cumsum(np.exp(k*log(lambd) - lambd - logfact))
+        idx = np.searchsorted(cdf, u)
+        np.minimum(idx, kmax - kmin, out=idx)
+        np.add(idx, kmin, out=out)
+        return out
+
+    def randints(self, n, a, b, out=None):
+        """
+        Generate the next `n` random integers in [a, b] of the stream as a
+        block, identical to `n` calls to `randint`.
+
+        Parameters
+        ----------
+        n : int
+            Number of integers to generate
+        a : int
+        b : int
+        out : numpy.ndarray of int64, optional
+            Array of length `n` in which to store the integers
+
+        Returns
+        -------
+        out : numpy.ndarray of int64
+        """
+        width = b - a + 1
+        if width < 1:
+            raise ValueError('empty range for randints (%d, %d)' % (a, b))
+        if out is None:
+            out = np.empty(n, dtype=np.int64)
+        elif out.shape != (n, ):
+            raise ValueError('out must be a 1-d array of length n.')
+        seed = self.get_seed()
+        if width < randmaxsize:
+            u = self.uniforms(n)
+            limit = (randmaxsize - randmaxsize % width)/randmaxsize
+            # `_randbelow` redraws above the limit, which is rare enough
+            # to redo the whole block in that case
+            if not n or u.max() < limit:
+                u *= randmaxsize
+                np.floor(u, out=u)
+                np.remainder(u.astype(np.int64), width, out=out)
+                out += a
+                return out
+            self.seed(seed)
+        for i in range(n):
+            out[i] = a + self._randbelow(width)
+        return out
+
+    def choose(self, n, seq):
+        """
+        Choose `n` random elements of a non-empty sequence, identical to
+        `n` calls to `choice`.
+
+        Parameters
+        ----------
+        n : int
+            Number of elements to choose
+        seq : sequence
+
+        Returns
+        -------
+        list
+        """
+        if not len(seq):
+            raise IndexError('Cannot choose from an empty sequence')
+        idx = self.randints(n, 0, len(seq) - 1)
+        return [seq[i] for i in idx]
+
+    def uniforms(self, n, out=None):
+        """
+        Generate the next `n` standard uniform variates of the stream as
+        a block and advance the generator state as `n` calls to `random`
+        would.
+
+        Parameters
+        ----------
+        n : int
+            Number of variates to generate
+        out : numpy.ndarray of float64, optional
+            Array of length `n` in which to store the variates
+
+        Returns
+        -------
+        out : numpy.ndarray of float64
+            The variates, identical to those of `n` calls to `random`
+
+        Notes
+        -----
+        The block is split into lanes started by exact integer jump-ahead
+        and the lanes are stepped together by `mrg32k3a_array`.
+        """
+        if np is None:
+            raise ImportError('MRG32k3a.uniforms requires NumPy.')
+        if out is None:
+            out = np.empty(n, dtype=np.float64)
+        elif out.shape != (n, ):
+            raise ValueError('out must be a 1-d array of length n.')
+        if n < 1:
+            return out
+        if self._rbuf is not None:
+            return self._replay_uniforms(n, out)
+        seed = self._current_seed
+        if n < blockmin:
+            for i in range(n):
+                seed, out[i] = mrg32k3a(seed)
+            self._current_seed = seed
+            self.gauss_next = None
+            self._mt_synced = False
+            return out
+        # about sqrt(n) lanes of `steps` draws each, the last may be short
+        steps = -(-n // max(1, int(sqrt(n))))
+        q, rem = divmod(n, steps)
+        num_lanes = q + (1 if rem else 0)
+        jump1 = matpow2mod(a1pow2, steps, mrgm1)
+        jump2 = matpow2mod(a2pow2, steps, mrgm2)
+        st = np.empty((6, num_lanes), dtype=np.int64)
+        s1 = seed[0:3]
+        s2 = seed[3:6]
+        for k in range(num_lanes):
+            st[0:3, k] = s1
+            st[3:6, k] = s2
+            s1 = matvecmod(jump1, s1, mrgm1)
+            s2 = matvecmod(jump2, s2, mrgm2)
+        lanes = tuple(st)
+        full = out[:q*steps].reshape(q, steps)
+        newseed = None
+        for t in range(steps):
+            lanes, u = mrg32k3a_array(lanes)
+            full[:, t] = u[:q]
+            if t < rem:
+                out[q*steps + t] = u[q]
+            if t == rem - 1:
+                newseed = tuple(int(v[q]) for v in lanes)
+        if not rem:
+            newseed = tuple(int(v[q - 1]) for v in lanes)
+        self._current_seed = newseed
+        self.gauss_next = None
+        self._mt_synced = False
+        return out
+
+    def _replay_uniforms(self, n, out):
+        """
+        Fill `out` with the next `n` uniforms from the current buffer,
+        generating and recording those past its end.
+
+        Parameters
+        ----------
+        n : int
+        out : numpy.ndarray of float64
+
+        Returns
+        -------
+        out : numpy.ndarray of float64
+        """
+        buf = self._rbuf
+        pos = self._rpos
+        k = min(n, max(0, len(buf) - pos))
+        if k:
+            out[:k] = np.frombuffer(buf, dtype=np.float64, count=k, offset=8*pos)
+            self.replay_totals[0] += k
+            self._current_seed = None
+            self._rpos = pos + k
+        if k < n:
+            seed = self.get_seed()
+            self._rbuf = None
+            self._current_seed = seed
+            self.uniforms(n - k, out[k:])
+            self._rbuf = buf
+            self.replay_totals[1] += n - k
+            if pos + k == len(buf) and self._replay_bytes + 8*(n - k) <= self.replay_maxbytes:
+                buf.frombytes(out[k:].tobytes())
+                self._replay_bytes += 8*(n - k)
+        self._rpos = pos + n
+        self.gauss_next = None
+        self._mt_synced = False
+        return out
+
+
+class MultiStreamMRG32k3a(object):
+    """
+    Advance many mrg32k3a streams in lockstep, generating one variate
+    from every stream per call, e.g. the j-th draw of every replication
+    substream at a point.
+
+    Attributes
+    ----------
+    num_streams : int
+        Number of streams, or lanes
+    inverse_normal : str
+        Name of the inverse standard normal cdf in `invnorms` used by
+        `normalvariate`. Default is 'bsm'.
+
+    Parameters
+    ----------
+    seeds : list of tuple of int
+        Starting mrg32k3a seed of every stream
+
+    See also
+    --------
+    get_substreams
+    """
+
+    inverse_normal = 'bsm'
+
+    def __init__(self, seeds):
+        if np is None:
+            raise ImportError('MultiStreamMRG32k3a requires NumPy.')
+        self.num_streams = len(seeds)
+        self.seed(seeds)
+
+    def seed(self, seeds):
+        """
+        Set the seed of every stream.
+
+        Parameters
+        ----------
+        seeds : list of tuple of int
+        """
+        assert(len(seeds) == self.num_streams)
+        st = np.array(seeds, dtype=np.int64).reshape(self.num_streams, 6)
+        self._state = tuple(st[:, i].copy() for i in range(6))
+
+    def get_seeds(self):
+        """
+        Return the current mrg32k3a seed of every stream.
+
+        Returns
+        -------
+        list of tuple of int
+        """
+        return [tuple(int(v) for v in sd) for sd in zip(*self._state)]
+
+    def set_inverse_normal(self, name):
+        """
+        Set the inverse standard normal cdf used by `normalvariate`.
+
+        Parameters
+        ----------
+        name : str
+            'bsm' or 'as241', see `MRG32k3a.set_inverse_normal`
+        """
+        if name not in invnorms:
+            raise ValueError('inverse normal must be one of ' + ', '.join(invnorms))
+        self.inverse_normal = name
+
+    def random(self, out=None):
+        """
+        Generate the next standard uniform variate of every stream.
+
+        Parameters
+        ----------
+        out : numpy.ndarray of float64, optional
+            Array of length `num_streams` in which to store the variates
+
+        Returns
+        -------
+        numpy.ndarray of float64
+            Element i is identical to `random` of stream i
+        """
+        self._state, u = mrg32k3a_array(self._state)
+        if out is None:
+            return u
+        out[:] = u
+        return out
+
+    def uniforms(self, n, out=None):
+        """
+        Generate the next `n` standard uniform variates of every stream.
+
+        Parameters
+        ----------
+        n : int
+        out : numpy.ndarray of float64, optional
+            Array of shape (`n`, `num_streams`) in which to store the
+            variates
+
+        Returns
+        -------
+        out : numpy.ndarray of float64
+            Row j holds the j-th variate of every stream
+        """
+        if out is None:
+            out = np.empty((n, self.num_streams), dtype=np.float64)
+        for j in range(n):
+            self._state, out[j] = mrg32k3a_array(self._state)
+        return out
+
+    def normalvariate(self, mu=0, sigma=1, out=None):
+        """
+        Generate the next normal variate of every stream by inversion.
+
+        Parameters
+        ----------
+        mu : float
+            Expected value of the normal distribution. Default is 0.
+        sigma : float
+            Standard deviation of the normal distribution. Default is 1.
+        out : numpy.ndarray of float64, optional
+            Array of length `num_streams` in which to store the variates
+
+        Returns
+        -------
+        out : numpy.ndarray of float64
+            Element i equals `normalvariate` of stream i to within the
+            tolerance of `bsm_array` or `as241_array`
+        """
+        out = self.random(out)
+        invnorms[self.inverse_normal][1](out, out)
+        out *= sigma
+        out += mu
+        return out
+
+    def expovariate(self, lambd=1.0, out=None):
+        """
+        Generate the next exponential variate of every stream by
+        inversion.
+
+        Parameters
+        ----------
+        lambd : float
+            Rate of the exponential distribution. Default is 1.
+        out : numpy.ndarray of float64, optional
+            Array of length `num_streams` in which to store the variates
+
+        Returns
+        -------
+        out : numpy.ndarray of float64
+        """
+        out = self.random(out)
+        np.subtract(1.0, out, out=out)
+        np.log(out, out=out)
+        np.negative(out, out=out)
+        out /= lambd
+        return out
+
+
+class StreamTree(object):
+    """
+    Node of a tree of non-overlapping mrg32k3a streams, laid out as
+    experiment, trial, iteration, replication and worker chunk.
+
+    Attributes
+    ----------
+    seed : tuple of int
+        mrg32k3a seed of the first draw of the node
+    level : int
+        Depth of the node, 0 for the experiment
+    path : tuple of int
+        Child indices from the experiment to the node
+
+    Parameters
+    ----------
+    seed : tuple of int
+    level : int, optional
+    path : tuple of int, optional
+
+    See also
+    --------
+    treelevels
+
+    Notes
+    -----
+    Node (i, j, ...) starts at offset i*2^(bits below trial) + j*2^(bits
+    below iteration) + ... from the experiment seed, jumped exactly with
+    `advance_seed`. Every node owns a disjoint range of the stream, and a
+    node's first child starts at the node's own seed. Any node is
+    reached in O(log) time from the experiment, without walking seeds.
+    """
+
+    def __init__(self, seed, level=0, path=()):
+        assert(len(seed) == 6)
+        assert(0 <= level <= len(treelevels))
+        self.seed = tuple(seed)
+        self.level = level
+        self.path = tuple(path)
+
+    def __repr__(self):
+        return 'StreamTree(%r, %d, %r)' % (self.seed, self.level, self.path)
+
+    def level_name(self):
+        """
+        Return the name of the level of the node's children.
+
+        Returns
+        -------
+        str
+            A name in `treelevels`, or 'draw' for a leaf
+        """
+        if self.level == len(treelevels):
+            return 'draw'
+        return treelevels[self.level][0]
+
+    def span_bits(self):
+        """
+        Return the base 2 logarithm of the number of draws the node owns.
+
+        Returns
+        -------
+        int
+        """
+        return treedrawbits + sum(bits for name, bits in treelevels[self.level:])
+
+    def child(self, i):
+        """
+        Return the `i`-th child of the node.
+
+        Parameters
+        ----------
+        i : int
+            Non-negative index below 2^bits of the child level
+
+        Returns
+        -------
+        StreamTree
+        """
+        assert(self.level < len(treelevels))
+        name, bits = treelevels[self.level]
+        if not 0 <= i < 2**bits:
+            raise IndexError('%s index must be in [0, 2^%d)' % (name, bits))
+        shift = self.span_bits() - bits
+        return StreamTree(advance_seed(self.seed, i << shift), self.level + 1, self.path + (i, ))
+
+    def children(self, start, num):
+        """
+        Return `num` consecutive children of the node from index `start`.
+
+        Parameters
+        ----------
+        start : int
+        num : int
+
+        Returns
+        -------
+        list of StreamTree
+        """
+        return [self.child(i) for i in range(start, start + num)]
+
+    def descendant(self, *path):
+        """
+        Return the node reached by following child indices `path`.
+
+        Parameters
+        ----------
+        path : int
+
+        Returns
+        -------
+        StreamTree
+        """
+        node = self
+        for i in path:
+            node = node.child(i)
+        return node
+
+    def get_seed(self):
+        """
+        Return the seed of the first draw of the node.
+
+        Returns
+        -------
+        tuple of int
+        """
+        return self.seed
+
+    def next_seed(self):
+        """
+        Return the seed just past the node's range, e.g. to start a later
+        experiment independent of this one.
+
+        Returns
+        -------
+        tuple of int
+        """
+        return advance_seed(self.seed, 1 << self.span_bits())
+
+    def rng(self, use_cache=False):
+        """
+        Instantiate a generator at the node's seed.
+
+        Parameters
+        ----------
+        use_cache : bool
+
+        Returns
+        -------
+        prn : MRG32k3a object
+        """
+        prn = MRG32k3a(self.seed)
+        prn.set_class_cache(use_cache)
+        return prn
+
+
+def mat333mult(a, b):
+    """
+    Multiply a 3x3 matrix with a 3x1 matrix.
+
+    Parameters
+    ----------
+    a : tuple of tuple of float
+        3x3 matrix
+    b : tuple of tuple if float
+        3x1 matrix
+
+    Returns
+    -------
+    res : list of float
+        3x1 matrix
+    """
+    res = [0, 0, 0]
+    r3 = range(3)
+    for i in r3:
+        # add left to right, as sum did before Python 3.12 compensated it
+        res[i] = a[i][0]*b[0] + a[i][1]*b[1] + a[i][2]*b[2]
+    return res
+
+
+def mat311mod(a, b):
+    """
+    Compute moduli of a 3x1 matrix.
+
+    Parameters
+    ----------
+    a : tuple of float
+        3x1 matrix
+    b : float
+        modulus
+
+    Returns
+    -------
+    res : tuple of float
+        3x1 matrix
+    """
+    res = [0, 0, 0]
     r3 = range(3)
     for i in r3:
         res[i] = int(a[i] - int(a[i]/b)*b)
     return res
 
 
+def matmultmod(a, b, m):
+    """
+    Multiply two 3x3 matrices modulo m with exact integer arithmetic.
+
+    Parameters
+    ----------
+    a : list of list of int
+        3x3 matrix
+    b : list of list of int
+        3x3 matrix
+    m : int or float
+        modulus
+
+    Returns
+    -------
+    res : list of list of int
+        3x3 matrix
+    """
+    m = int(m)
+    res = [[0, 0, 0], [0, 0, 0], [0, 0, 0]]
+    r3 = range(3)
+    for i in r3:
+        for j in r3:
+            res[i][j] = (a[i][0]*b[0][j] + a[i][1]*b[1][j] + a[i][2]*b[2][j]) % m
+    return res
+
+
+def matvecmod(a, b, m):
+    """
+    Multiply a 3x3 matrix with a 3x1 matrix modulo m with exact integer
+    arithmetic.
+
+    Parameters
+    ----------
+    a : list of list of int
+        3x3 matrix
+    b : tuple of int
+        3x1 matrix
+    m : int or float
+        modulus
+
+    Returns
+    -------
+    tuple of int
+        3x1 matrix
+    """
+    m = int(m)
+    b0, b1, b2 = b
+    a0, a1, a2 = a
+    return ((a0[0]*b0 + a0[1]*b1 + a0[2]*b2) % m,
+        (a1[0]*b0 + a1[1]*b1 + a1[2]*b2) % m,
+        (a2[0]*b0 + a2[1]*b1 + a2[2]*b2) % m)
+
+
+def matpow2mod(table, e, m):
+    """
+    Raise a 3x3 matrix to a non-negative integer power modulo m using a
+    table of its powers of two.
+
+    Parameters
+    ----------
+    table : list of list of list of int
+        table[k] is the 3x3 matrix raised to the power 2^k
+    e : int
+        exponent, less than 2^len(table)
+    m : int or float
+        modulus
+
+    Returns
+    -------
+    res : list of list of int
+        3x3 matrix
+    """
+    res = [[1, 0, 0], [0, 1, 0], [0, 0, 1]]
+    k = 0
+    while e:
+        if e & 1:
+            res = matmultmod(res, table[k], m)
+        e >>= 1
+        k += 1
+    return res
+
+
+def advance_seed(seed, n):
+    """
+    Compute the mrg32k3a seed `n` steps from the input seed by exact
+    jump-ahead.
+
+    Parameters
+    ----------
+    seed : tuple of int
+    n : int
+        Number of steps, may be any integer. Negative steps move back.
+
+    Returns
+    -------
+    tuple of int
+
+    Notes
+    -----
+    Applies one precomputed A^(2^k) mod m per set bit of `n`, so the
+    cost is O(log n). Steps outside [0, 2^192) are first reduced modulo
+    the component periods. Unlike
+    `get_next_prnstream` and `jump_substream`, which keep their rounded
+    float products so existing seeds stay reproducible, the result is
+    exact, e.g. `advance_seed(seed, 2**76)` is the true next substream.
+    """
+    assert(len(seed) == 6)
+    s1 = tuple(seed[0:3])
+    s2 = tuple(seed[3:6])
+    e = n if 0 <= n < 2**jumpbits else n % mrgper1
+    while e:
+        # apply the lowest set bit of e
+        low = e & -e
+        s1 = matvecmod(a1pow2[low.bit_length() - 1], s1, mrgm1)
+        e ^= low
+    e = n if 0 <= n < 2**jumpbits else n % mrgper2
+    while e:
+        # apply the lowest set bit of e
+        low = e & -e
+        s2 = matvecmod(a2pow2[low.bit_length() - 1], s2, mrgm2)
+        e ^= low
+    return s1 + s2
+
+
+def jump_seed(seed, a1, a2):
+    """
+    Jump an mrg32k3a seed with the float jump matrices of each component,
+    as `get_next_prnstream` and `jump_substream` do.
+
+    Parameters
+    ----------
+    seed : tuple of int
+    a1 : list of list of float
+        3x3 jump matrix of the first component
+    a2 : list of list of float
+        3x3 jump matrix of the second component
+
+    Returns
+    -------
+    tuple of int
+    """
+    # A*s % m for both seed parts, unrolled from mat333mult and mat311mod
+    s0, s1, s2, s3, s4, s5 = seed
+    ns = []
+    for r in a1:
+        p = r[0]*s0 + r[1]*s1 + r[2]*s2
+        ns.append(int(p - int(p/mrgm1)*mrgm1))
+    for r in a2:
+        p = r[0]*s3 + r[1]*s4 + r[2]*s5
+        ns.append(int(p - int(p/mrgm2)*mrgm2))
+    # random.Random objects need a hashable seed e.g. a tuple
+    return tuple(ns)
+
+
+def stream_at(seed, i):
+    """
+    Compute the seed of the `i`-th stream from the input seed, i.e. the
+    seed of the generator after `i` chained calls to `get_next_prnstream`,
+    without constructing the intermediate generators.
+
+    Parameters
+    ----------
+    seed : tuple of int
+    i : int
+        Non-negative stream index
+
+    Returns
+    -------
+    seed : tuple of int
+
+    Notes
+    -----
+    The stream jumps round their products to floats, so they are not
+    powers of a linear map and the walk takes `i` jumps. Use
+    `advance_seed` for exact jumps in O(log i).
+    """
+    assert(len(seed) == 6)
+    for k in range(i):
+        seed = jump_seed(seed, a1p127, a2p127)
+    return seed
+
+
+def substream_at(seed, j):
+    """
+    Compute the seed of the `j`-th substream from the input seed, i.e.
+    the seed after `j` calls to `jump_substream`.
+
+    Parameters
+    ----------
+    seed : tuple of int
+    j : int
+        Non-negative substream index
+
+    Returns
+    -------
+    seed : tuple of int
+
+    See also
+    --------
+    stream_at
+    """
+    assert(len(seed) == 6)
+    for k in range(j):
+        seed = jump_seed(seed, a1p76, a2p76)
+    return seed
+
+
+def seed_at(seed, substream, index):
+    """
+    Compute the seed from which the `index`-th uniform of the
+    `substream`-th substream of the input seed is generated.
+
+    Parameters
+    ----------
+    seed : tuple of int
+    substream : int
+        Non-negative substream index, as in `substream_at`
+    index : int
+        Non-negative index of the uniform in the substream
+
+    Returns
+    -------
+    seed : tuple of int
+
+    See also
+    --------
+    uniform_at
+    """
+    return advance_seed(substream_at(seed, substream), index)
+
+
+def uniform_at(seed, substream, index):
+    """
+    Compute the `index`-th uniform of the `substream`-th substream of the
+    input seed directly, i.e. the uniform a generator seeded at `seed`
+    returns after `substream` calls to `jump_substream` and `index` calls
+    to `random`.
+
+    Parameters
+    ----------
+    seed : tuple of int
+    substream : int
+        Non-negative substream index. With common random numbers, it is
+        the replication number of `Oracle.hit`.
+    index : int
+        Non-negative index of the uniform in the substream
+
+    Returns
+    -------
+    u : float
+
+    See also
+    --------
+    seed_at
+
+    Notes
+    -----
+    Jumping within the substream is exact and takes O(log index) time.
+    Reaching the substream walks `substream` legacy jumps, so workers
+    taking many uniforms of one substream should keep its seed from
+    `substream_at` and call `seed_at` on it with substream 0.
+    """
+    newseed, u = mrg32k3a(seed_at(seed, substream, index))
+    return u
+
+
 def get_next_prnstream(seed, use_cache):
     """
     Instantiate a generator seeded 2^127 steps from the input seed.
@@ -341,18 +2044,7 @@ def get_next_prnstream(seed, use_cache):
     -------
     prn : MRG32k3a object
     """
-    assert(len(seed) == 6)
-    # split the seed into 2 components of length 3
-    s1 = seed[0:3]
-    s2 = seed[3:6]
-    # A*s % m for both seed parts
-    ns1m = mat333mult(a1p127, s1)
-    ns2m = mat333mult(a2p127, s2)
-    ns1 = mat311mod(ns1m, mrgm1)
-    ns2 = mat311mod(ns2m, mrgm2)
-    # random.Random objects need a hashable seed e.g. a tuple
-    sseed = tuple(ns1 + ns2)
-    prn = MRG32k3a(sseed)
+    prn = MRG32k3a(stream_at(seed, 1))
     prn.set_class_cache(use_cache)
     return prn
 
@@ -364,15 +2056,35 @@ def jump_substream(prn):
     ----------
     prn : MRG32k3a object
     """
-    seed = prn.get_seed()
-    # split the seed into 2 components of length 3
-    s1 = seed[0:3]
-    s2 = seed[3:6]
-    # A*s % m for both seed parts
-    ns1m = mat333mult(a1p76, s1)
-    ns2m = mat333mult(a2p76, s2)
-    ns1 = mat311mod(ns1m, mrgm1)
-    ns2 = mat311mod(ns2m, mrgm2)
-    # random.Random objects need a hashable seed e.g. a tuple
-    sseed = tuple(ns1 + ns2)
-    prn.seed(sseed)
+    prn.seed(jump_seed(prn.get_seed(), a1p76, a2p76))
+
+
+def get_substreams(seed, num_streams):
+    """
+    Instantiate a lockstep generator over `num_streams` consecutive
+    substreams, starting with the one seeded by the input seed.
+
+    Parameters
+    ----------
+    seed : tuple of int
+    num_streams : int
+
+    Returns
+    -------
+    MultiStreamMRG32k3a object
+        Stream i starts at `substream_at(seed, i)`, the seed of the i-th
+        replication taken through `Oracle.crn_nextobs`
+    """
+    assert(len(seed) == 6)
+    seeds = [tuple(seed)]
+    for i in range(1, num_streams):
+        seeds.append(jump_seed(seeds[-1], a1p76, a2p76))
+    return MultiStreamMRG32k3a(seeds)
+
+
+## A^(2^k) mod m of both components for every k < jumpbits
+a1pow2 = [a1p0]
+a2pow2 = [a2p0]
+for k in range(1, jumpbits):
+    a1pow2.append(matmultmod(a1pow2[k - 1], a1pow2[k - 1], mrgm1))
+    a2pow2.append(matmultmod(a2pow2[k - 1], a2pow2[k - 1], mrgm2))
@@ -22,6 +22,8 @@ class BSProb(Oracle):
         Exponential factor of the cost of passengers. Default is 0.5.
     c0 : float
         The flat cost of scheduling a bus. Default is 100.
+    bounds : list of tuple
+        [(0, tau)] for each bus
 
     Parameters
     ----------
@@ -38,6 +40,7 @@ class BSProb(Oracle):
         self.lambd = 10
         self.gamma = 0.5
         self.c0 = 100
+        self.bounds = [(0, self.tau)]*self.dim
         super().__init__(rng)
 
     def g(self, x, rng):
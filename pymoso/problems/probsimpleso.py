@@ -16,6 +16,7 @@ class ProbSimpleSO(Oracle):
     ----------
     num_obj : int, 1
     dim : int, 1
+    bounds : list of tuple, [(-100, 100)]
 
     Parameters
     ----------
@@ -28,6 +29,7 @@ class ProbSimpleSO(Oracle):
     def __init__(self, rng):
         self.num_obj = 1
         self.dim = 1
+        self.bounds = [(-100, 100)]*self.dim
         super().__init__(rng)
 
     def g(self, x, rng):
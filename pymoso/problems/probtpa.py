@@ -15,6 +15,7 @@ class ProbTPA(Oracle):
     ----------
     num_obj : int, 2
     dim : int, 2
+    bounds : list of tuple, [(0, 50), (0, 50)]
 
     Parameters
     ----------
@@ -27,6 +28,7 @@ class ProbTPA(Oracle):
     def __init__(self, rng):
         self.num_obj = 2
         self.dim = 2
+        self.bounds = [(0, 50)]*self.dim
         super().__init__(rng)
 
     def g(self, x, rng):
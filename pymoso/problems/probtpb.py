@@ -16,6 +16,7 @@ class ProbTPB(Oracle):
     ----------
     num_obj : int, 2
     dim : int, 2
+    bounds : list of tuple, [(0, 100), (0, 100)]
 
     Parameters
     ----------
@@ -28,6 +29,7 @@ class ProbTPB(Oracle):
     def __init__(self, rng):
         self.num_obj = 2
         self.dim = 2
+        self.bounds = [(0, 100)]*self.dim
         super().__init__(rng)
 
     def g(self, x, rng):
@@ -17,6 +17,8 @@ class ProbTPC(Oracle):
     num_obj : int, 2
     dim : int, 3
     density_factor : int, 2
+    bounds : list of tuple
+        [(-5*density_factor, 5*density_factor)] for each component
 
     Parameters
     ----------
@@ -31,6 +33,8 @@ class ProbTPC(Oracle):
         self.num_obj = 2
         self.dim = 3
         self.density_factor = 2
+        df = self.density_factor
+        self.bounds = [(-5*df, 5*df)]*self.dim
         super().__init__(rng)
 
     def g(self, x, rng):
@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+"""
+Provide an on-disk cache of simulation replications, so that reruns of
+an oracle with the same seeds skip replications already taken.
+
+Listing
+--------------
+SimCacheInfo, namedtuple
+rep_key, function
+SimCache(object), class
+"""
+import os
+import json
+import sqlite3
+from collections import namedtuple
+
+
+SimCacheInfo = namedtuple('SimCacheInfo', ['hits', 'misses', 'stores', 'maxrows', 'currsize'])
+
+
+def rep_key(v):
+    """
+    Return the text under which a point or seed is stored.
+
+    Parameters
+    ----------
+    v : tuple of numbers
+
+    Returns
+    -------
+    str
+    """
+    return ','.join(str(vi) for vi in v)
+
+
+class SimCache(object):
+    """
+    Store the replications of oracles in an sqlite database, keyed by
+    oracle, point, and the mrg32k3a seed of the replication.
+
+    Attributes
+    ----------
+    path : str
+        File of the database
+    maxrows : int
+        Most replications the database keeps. The oldest are removed
+        first. Default is 10**7.
+    hits : int
+        Replications found in this process
+    misses : int
+        Replications not found in this process
+    stores : int
+        Replications saved by this process
+
+    Parameters
+    ----------
+    path : str
+    maxrows : int, optional
+
+    Notes
+    -----
+    Each process opens its own connection when it first uses the cache,
+    so a SimCache may be copied to `chnutils.par_runs` workers. The
+    database uses write-ahead logging and waits for the locks of other
+    writers, so processes may read and write it at once.
+    """
+
+    def __init__(self, path, maxrows=10**7):
+        self.path = path
+        self.maxrows = maxrows
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.conn = None
+        self.pid = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['conn'] = None
+        state['pid'] = None
+        return state
+
+    def connect(self):
+        """
+        Return the connection of this process, opening it and creating
+        the table if needed.
+
+        Returns
+        -------
+        sqlite3.Connection object
+        """
+        if self.conn is None or self.pid != os.getpid():
+            self.conn = sqlite3.connect(self.path, timeout=60)
+            self.pid = os.getpid()
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            with self.conn:
+                self.conn.execute('CREATE TABLE IF NOT EXISTS reps (oracle TEXT, point TEXT, seed TEXT, feas INTEGER, objd TEXT, PRIMARY KEY (oracle, point, seed))')
+        return self.conn
+
+    def get_many(self, key, reqs):
+        """
+        Look up replications.
+
+        Parameters
+        ----------
+        key : str
+            Identifies the oracle, see `Oracle.simcache_key`
+        reqs : list of tuple
+            (x, seed) of each replication
+
+        Returns
+        -------
+        list
+            The (isfeas, objd) of each replication, or None if it is
+            not in the cache. 'objd' is a tuple of what `g` returned.
+        """
+        conn = self.connect()
+        found = []
+        for x, seed in reqs:
+            row = conn.execute('SELECT feas, objd FROM reps WHERE oracle=? AND point=? AND seed=?', (key, rep_key(x), rep_key(seed))).fetchone()
+            if row is None:
+                self.misses += 1
+                found.append(None)
+            else:
+                self.hits += 1
+                objd = json.loads(row[1])
+                if isinstance(objd, list):
+                    objd = tuple(objd)
+                found.append((bool(row[0]), objd))
+        return found
+
+    def put_many(self, key, reps):
+        """
+        Save replications, then remove the oldest beyond `maxrows`.
+
+        Parameters
+        ----------
+        key : str
+            Identifies the oracle, see `Oracle.simcache_key`
+        reps : list of tuple
+            (x, seed, isfeas, objd) of each replication
+        """
+        if not reps:
+            return
+        conn = self.connect()
+        rows = []
+        for x, seed, isfeas, objd in reps:
+            if isfeas:
+                text = json.dumps([None if v is None else float(v) for v in objd])
+            else:
+                # infeasible values need not be numbers, e.g. ([], )
+                try:
+                    text = json.dumps(objd)
+                except (TypeError, ValueError):
+                    text = json.dumps([None for v in objd])
+            rows.append((key, rep_key(x), rep_key(seed), int(bool(isfeas)), text))
+        with conn:
+            conn.executemany('INSERT OR REPLACE INTO reps VALUES (?, ?, ?, ?, ?)', rows)
+            last = conn.execute('SELECT MAX(rowid) FROM reps').fetchone()[0]
+            conn.execute('DELETE FROM reps WHERE rowid <= ?', (last - self.maxrows, ))
+        self.stores += len(rows)
+
+    def cache_info(self):
+        """
+        Report the use of the cache by this process.
+
+        Returns
+        -------
+        SimCacheInfo namedtuple
+            hits, misses, and stores of this process, maxrows, and the
+            number of replications in the database
+        """
+        currsize = self.connect().execute('SELECT COUNT(*) FROM reps').fetchone()[0]
+        return SimCacheInfo(self.hits, self.misses, self.stores, self.maxrows, currsize)
+
+    def close(self):
+        """
+        Close the connection of this process.
+        """
+        if self.conn is not None and self.pid == os.getpid():
+            self.conn.close()
+        self.conn = None
+        self.pid = None
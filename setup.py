@@ -35,6 +35,9 @@ setup(
     url = 'https://github.com/pymoso/PyMOSO',
     packages = ['pymoso', 'pymoso.solvers', 'pymoso.commands', 'pymoso.prng', 'pymoso.problems', 'pymoso.testers'],
     install_requires = ['docopt'],
+    extras_require = {
+        'numpy': ['numpy'],
+    },
     entry_points = {
         'console_scripts': [
             'pymoso = pymoso.cli:main',
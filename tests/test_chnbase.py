@@ -0,0 +1,188 @@
+"""
+Check that the Oracle paths agree with each other.
+"""
+import asyncio
+from pymoso import chnbase
+from pymoso.chnbase import Oracle
+from pymoso.chnutils import solve
+from pymoso.prng.mrg32k3a import MRG32k3a
+from pymoso.problems import ProbSimpleSO
+from pymoso.solvers import RSPLINE
+
+
+class AsyncOnly(Oracle):
+    """An Oracle implementing only `ag`."""
+
+    def __init__(self, rng):
+        self.num_obj = 2
+        self.dim = 1
+        super().__init__(rng)
+
+    async def ag(self, x, rng):
+        await asyncio.sleep(0)
+        if x[0] < 0:
+            return False, (None, None)
+        z = rng.normalvariate(0, 1)
+        return True, (x[0] + z, x[0]*z)
+
+
+def make_orc(cls, crn):
+    orc = cls(MRG32k3a((7, )*6))
+    orc.set_crnflag(crn)
+    orc.set_simpar(1)
+    return orc
+
+
+def test_ag_hit_one_replication():
+    for crn in (False, True):
+        for x in [(3, ), (-1, )]:
+            orc1 = make_orc(AsyncOnly, crn)
+            orc2 = make_orc(AsyncOnly, crn)
+            assert orc1.hit(x, 1) == orc2.hit_many([x], 1)[0]
+            assert orc1.rng.get_seed() == orc2.rng.get_seed()
+            orc1.mp_cleanup()
+            orc2.mp_cleanup()
+
+
+class HalfInfeasible(Oracle):
+    """An Oracle infeasible on some replications, with non-numeric values."""
+
+    def __init__(self, rng):
+        self.num_obj = 2
+        self.dim = 1
+        super().__init__(rng)
+
+    def g(self, x, rng):
+        z = rng.normalvariate(0, 1)
+        if z > 0.5:
+            return False, ([], None)
+        return True, (x[0] + z, x[0]*z)
+
+
+def test_bump_backends():
+    for crn in (False, True):
+        orc = make_orc(HalfInfeasible, crn)
+        serial = orc.bump((3, ), 20)
+        for backend in ('thread', 'process'):
+            porc = HalfInfeasible(MRG32k3a((7, )*6))
+            porc.set_crnflag(crn)
+            porc.set_simpar(2, backend)
+            assert porc.bump((3, ), 20) == serial
+            assert porc.rng.get_seed() == orc.rng.get_seed()
+            porc.mp_cleanup()
+
+
+class Scaled(Oracle):
+    """An Oracle with an attribute set after construction."""
+
+    def __init__(self, rng):
+        self.num_obj = 2
+        self.dim = 1
+        self.scale = 1
+        super().__init__(rng)
+
+    def g(self, x, rng):
+        z = rng.normalvariate(0, 1)
+        return True, (self.scale*(x[0] + z), x[0]*z*z)
+
+
+def run_scaled(crn, simpar, backend):
+    orc = Scaled(MRG32k3a((7, )*6))
+    orc.scale = 10
+    orc.set_crnflag(crn)
+    orc.set_simpar(simpar, backend)
+    res = [orc.hit((2, ), m) for m in (1, 5, 40)]
+    res.append(orc.hit_many([(1, ), (2, )], 13))
+    res.append(orc.bump((3, ), 9))
+    res.append(orc.rng.get_seed())
+    orc.mp_cleanup()
+    return res
+
+
+def test_backends_match_serial():
+    for crn in (False, True):
+        serial = run_scaled(crn, 1, 'serial')
+        for simpar in (2, 3):
+            assert run_scaled(crn, simpar, 'thread') == serial
+            assert run_scaled(crn, simpar, 'process') == serial
+
+
+def test_process_without_shared_memory(monkeypatch):
+    # as before Python 3.8, observations come back through the queue
+    monkeypatch.setattr(chnbase, 'shared_memory', None)
+    for crn in (False, True):
+        assert run_scaled(crn, 2, 'process') == run_scaled(crn, 1, 'serial')
+        serial = make_orc(HalfInfeasible, crn)
+        porc = HalfInfeasible(MRG32k3a((7, )*6))
+        porc.set_crnflag(crn)
+        porc.set_simpar(2)
+        assert porc.obsbuf is None
+        assert porc.bump((3, ), 20) == serial.bump((3, ), 20)
+        porc.mp_cleanup()
+
+
+class Counted(ProbSimpleSO):
+    """ProbSimpleSO, counting the replications taken."""
+
+    def __init__(self, rng):
+        self.calls = 0
+        super().__init__(rng)
+
+    def g(self, x, rng):
+        self.calls += 1
+        return super().g(x, rng)
+
+
+class Unbounded(Counted):
+    """Counted without bounds, so every point is simulated."""
+
+    def __init__(self, rng):
+        super().__init__(rng)
+        self.bounds = None
+
+
+def test_is_feasible():
+    orc = ProbSimpleSO(MRG32k3a())
+    assert orc.is_feasible((-100, ))
+    assert orc.is_feasible((100, ))
+    assert not orc.is_feasible((101, ))
+    assert not orc.is_feasible((0, 0))
+    assert not orc.is_feasible(())
+    assert Unbounded(MRG32k3a()).is_feasible((0, 0))
+
+
+def test_rejected_points_match_simulated():
+    points = [(3, ), (150, ), (-7, ), (-101, ), (3, )]
+    for crn in (False, True):
+        for m in (1, 4):
+            for backend in ('serial', 'process'):
+                res = []
+                for cls in (Counted, Unbounded):
+                    orc = cls(MRG32k3a((7, )*6))
+                    orc.set_crnflag(crn)
+                    orc.set_simpar(2, backend)
+                    hits = [orc.hit(x, m) for x in points]
+                    hits.append(orc.hit_many(points, m))
+                    res.append((hits, orc.rng.get_seed()))
+                    orc.mp_cleanup()
+                assert res[0] == res[1]
+                assert res[0][0][1] == (False, [], [])
+
+
+def test_rejected_points_not_simulated():
+    orc = Counted(MRG32k3a((7, )*6))
+    orc.set_simpar(1)
+    orc.hit_many([(150, ), (-101, )], 5)
+    assert orc.calls == 0
+    orc.hit((3, ), 5)
+    assert orc.calls == 5
+    # bump returns what g does, so it simulates rejected points
+    isfeas, obs = orc.bump((150, ), 3)
+    assert obs == [([], )]*3
+    assert orc.calls == 8
+
+
+def test_solvers_prune_without_changing_results():
+    for crn in (False, True):
+        res = [solve(cls, RSPLINE, (97, ), budget=2000, seed=(12345, )*6, simpar=1, crn=crn) for cls in (Counted, Unbounded)]
+        assert res[0] == res[1]
@@ -0,0 +1,127 @@
+"""
+Check that the batched streams of MRG32k3a equal its scalar streams.
+"""
+from math import sqrt, exp, log, lgamma
+import numpy as np
+from pymoso.prng.mrg32k3a import MRG32k3a, gammainc_array, gamtiny
+
+
+sizes = [0, 1, 255, 256, 257, 5000]
+seed = (12345, 23456, 34567, 45678, 56789, 67890)
+
+
+def test_uniforms_match_random():
+    for n in sizes:
+        batch = MRG32k3a(seed)
+        scalar = MRG32k3a(seed)
+        us = batch.uniforms(n)
+        assert len(us) == n
+        assert us.tolist() == [scalar.random() for i in range(n)]
+        assert batch.get_seed() == scalar.get_seed()
+
+
+def test_normals_match_normalvariate():
+    for invnorm in ('bsm', 'as241'):
+        for mu, sigma in [(0, 1), (2.5, 3)]:
+            for n in sizes:
+                batch = MRG32k3a(seed)
+                scalar = MRG32k3a(seed)
+                batch.set_inverse_normal(invnorm)
+                scalar.set_inverse_normal(invnorm)
+                zs = batch.normals(n, mu, sigma)
+                assert len(zs) == n
+                for zb in zs.tolist():
+                    zs_ = scalar.normalvariate(mu, sigma)
+                    z = (zs_ - mu)/sigma
+                    # the documented bound of bsm_array, and rounding of mu
+                    assert abs(zb - zs_) <= sigma*5e-15*max(1, abs(z)) + 1e-15*abs(mu)
+                assert batch.get_seed() == scalar.get_seed()
+
+
+def check_moments(xs, mean, var):
+    """Check the sample mean and variance within 6 standard errors."""
+    n = len(xs)
+    assert abs(xs.mean() - mean) <= 6*sqrt(var/n)
+    assert abs(xs.var() - var) <= 0.05*var
+
+
+def test_exponentials():
+    for lambd in (0.5, 2):
+        batch = MRG32k3a(seed)
+        scalar = MRG32k3a(seed)
+        xs = batch.exponentials(5000, lambd)
+        for x in xs.tolist():
+            xs_ = scalar.expovariate(lambd)
+            assert abs(x - xs_) <= 1e-14*max(1, xs_)
+        assert batch.get_seed() == scalar.get_seed()
+        check_moments(batch.exponentials(100000, lambd), 1/lambd, 1/lambd**2)
+
+
+def test_gammas():
+    for alpha, beta in [(0.001, 1), (0.01, 2), (0.1, 1), (0.5, 3), (1, 1), (7.5, 0.5)]:
+        batch = MRG32k3a(seed)
+        scalar = MRG32k3a(seed)
+        xs = batch.gammas(100000, alpha, beta)
+        us = scalar.uniforms(100000)
+        assert batch.get_seed() == scalar.get_seed()
+        assert np.all(np.isfinite(xs))
+        assert np.all(xs >= 0)
+        pos = xs > 0
+        assert np.allclose(gammainc_array(alpha, xs[pos]/beta), us[pos], rtol=0, atol=1e-8)
+        # the zeros are quantiles that underflow, up to the initial guess
+        assert np.all(us[~pos] <= gammainc_array(alpha, [1e3*gamtiny])[0])
+        if alpha >= 0.01:
+            check_moments(xs, alpha*beta, alpha*beta**2)
+
+
+def test_poissons():
+    for lambd in (0, 0.3, 4, 250):
+        batch = MRG32k3a(seed)
+        scalar = MRG32k3a(seed)
+        ks = batch.poissons(5000, lambd)
+        for k in ks.tolist():
+            u = scalar.random()
+            # invert the cdf term by term
+            j = 0
+            cdf = exp(-lambd)
+            while cdf < u:
+                j += 1
+                cdf += exp(j*log(lambd) - lambd - lgamma(j + 1))
+            assert k == j
+        assert batch.get_seed() == scalar.get_seed()
+        check_moments(batch.poissons(100000, lambd), lambd, lambd)
+
+
+def test_randints_and_choose():
+    for a, b in [(0, 0), (-3, 4), (1, 10**6)]:
+        batch = MRG32k3a(seed)
+        scalar = MRG32k3a(seed)
+        ks = batch.randints(5000, a, b)
+        assert ks.tolist() == [scalar.randint(a, b) for i in range(5000)]
+        assert batch.get_seed() == scalar.get_seed()
+        if a < b:
+            ks = batch.randints(100000, a, b)
+            check_moments(ks, (a + b)/2, ((b - a + 1)**2 - 1)/12)
+    seq = ['a', 'b', 'c', 'd', 'e', 'f', 'g']
+    batch = MRG32k3a(seed)
+    scalar = MRG32k3a(seed)
+    assert batch.choose(5000, seq) == [scalar.choice(seq) for i in range(5000)]
+    assert batch.get_seed() == scalar.get_seed()
+
+
+def test_cache_info_evictions():
+    for policy, hits, evictions in [('lru', 0, 190), ('retain', 100, 0)]:
+        rng = MRG32k3a()
+        rng.set_class_cache(True, maxsize=50, policy=policy)
+        for i in range(3):
+            rng.seed(seed)
+            for j in range(80):
+                rng.random()
+        info = rng.cache_info()['generate']
+        assert (info['hits'], info['misses'], info['evictions'], info['currsize']) == (hits, 240 - hits, evictions, 50)
+        if policy == 'lru':
+            assert info['currsize'] == info['misses'] - info['evictions']
+        # entries emptied by cache_clear are not evictions
+        rng.cache_clear()
+        info = rng.cache_info()['generate']
+        assert (info['hits'], info['misses'], info['evictions'], info['currsize']) == (hits, 240 - hits, evictions, 0)
@@ -0,0 +1,42 @@
+"""
+Check that cached replications give the results of uncached ones.
+"""
+from pymoso.chnbase import Oracle
+from pymoso.simcache import SimCache
+from pymoso.prng.mrg32k3a import MRG32k3a
+
+
+class EmptyInfeasible(Oracle):
+    """An Oracle without bounds, infeasible as ProbSimpleSO.g reports it."""
+
+    def __init__(self, rng):
+        self.num_obj = 1
+        self.dim = 1
+        super().__init__(rng)
+
+    def g(self, x, rng):
+        z = rng.normalvariate(0, 1)
+        if x[0] < 0:
+            return False, ([], )
+        return True, (x[0] + z, )
+
+
+def run(path=None):
+    orc = EmptyInfeasible(MRG32k3a((7, )*6))
+    orc.set_crnflag(True)
+    orc.set_simpar(1)
+    if path:
+        orc.set_simcache(SimCache(path))
+    out = [orc.hit((-2, ), 1), orc.hit((-2, ), 5), orc.hit((2, ), 1), orc.hit((2, ), 5), orc.bump((-2, ), 3), orc.hit_many([(1, ), (-1, )], 4)]
+    orc.mp_cleanup()
+    return out
+
+
+def test_infeasible_cached(tmp_path):
+    path = str(tmp_path / 'simcache.sqlite')
+    uncached = run()
+    assert run(path) == uncached
+    # the second run finds every replication in the cache
+    assert run(path) == uncached
+    # with crn, each point reuses the first replications of its others
+    assert SimCache(path).cache_info().currsize == 5 + 5 + 4 + 4